@@ -1,3 +1,18 @@
+from .metrics import *
+from .cache import *
+from .checkpoint import *
+from .client import *
+from .crawl import *
+from .elections import *
+from .fetch import *
+from .parse import *
+from .parse_pool import *
 from .scrape import *
+from .extract import *
 from .merge import *
-from .aggregate import *
\ No newline at end of file
+from .aggregate import *
+from .schema import *
+from .storage import *
+from .database import *
+from .incremental import *
+from .pipeline import *
@@ -1,6 +1,17 @@
-import pandas as pd
+from .metrics import timer
+from .schema import apply_schema
 
+# columns of merged data required for aggregation
+AGGREGATION_COLUMNS = [
+    "Партія",
+    "Регіон",
+    "Рада",
+    "Статус",
+    "Прізвище, ім’я, по батькові",
+]
 
+
+@timer("aggregate_by_party_region_council")
 def aggregate_by_party_region_council(candidates_data):
     """Aggregate candidates info data by party, region and council.
     For councils that don't provide data on nominated candidates, the number of nominees will be NA.
@@ -12,35 +23,31 @@ def aggregate_by_party_region_council(candidates_data):
     Returns:
         DataFrame: aggregated data
     """
+    # group by codes of categories
+    candidates_data = apply_schema(candidates_data)
     # aggregate data
     aggregated_data = (
-        candidates_data.groupby(["Партія", "Регіон", "Рада"], as_index=False)
+        candidates_data.assign(**{"Обрано": candidates_data["Статус"] == "обрано"})
+        .groupby(["Партія", "Регіон", "Рада"], as_index=False, observed=True)
         .agg(
-            {
-                "Статус": lambda x: (x == "обрано").sum(),
-                "Прізвище, ім’я, по батькові": "count",
-            }
-        )
-        .rename(
-            columns={
-                "Статус": "Кількість обраних",
-                "Прізвище, ім’я, по батькові": "Кількість висунутих",
+            **{
+                "Кількість обраних": ("Обрано", "sum"),
+                "Кількість висунутих": ("Прізвище, ім’я, по батькові", "count"),
             }
         )
     )
     # assign NA where unknown number of nominated candidates
     # select councils in which the number of nominated is equal to the number of elected
-    councils_nominated_equal_elected = (
-        aggregated_data.groupby(["Регіон", "Рада"], as_index=False)
-        .agg({"Кількість обраних": sum, "Кількість висунутих": sum})
-        .query("`Кількість обраних` == `Кількість висунутих`")
+    council_totals = aggregated_data.groupby(["Регіон", "Рада"], observed=True)[
+        ["Кількість обраних", "Кількість висунутих"]
+    ].transform("sum")
+    nominated_equal_elected = (
+        council_totals["Кількість обраних"] == council_totals["Кількість висунутих"]
     )
     # assign number of nominated to NA for these councils
-    # TO DO: rewrite in a more civilised way
-    for i in range(len(councils_nominated_equal_elected)):
-        aggregated_data.loc[
-            (aggregated_data["Регіон"] == councils_nominated_equal_elected.iloc[i, 0])
-            & (aggregated_data["Рада"] == councils_nominated_equal_elected.iloc[i, 1]),
-            "Кількість висунутих",
-        ] = pd.NA
+    aggregated_data["Кількість висунутих"] = (
+        aggregated_data["Кількість висунутих"]
+        .astype("Int64")
+        .mask(nominated_equal_elected)
+    )
     return aggregated_data
@@ -0,0 +1,169 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+# when the cache exceeds max_size, it is shrunk to this share of max_size,
+# so the directory isn't scanned on every stored page
+_EVICTION_LOW_WATER = 0.9
+
+
+class PageNotCachedError(LookupError):
+    """Raised in offline mode when a page is absent in the cache"""
+
+
+class PageCache:
+    """Persistent on-disk cache of downloaded pages.
+
+    Every page is stored under the SHA-256 hash of its URL as two files: compressed content
+    (`<hash>.gz`) and metadata (`<hash>.json`) with validators (ETag, Last-Modified),
+    the time of the last check and the hash of the content.
+
+    Args:
+        cache_dir (str or Path): directory for cached pages
+        ttl (float, optional): number of seconds after which a cached page must be revalidated.
+        If provided None, cached pages never expire. Defaults to None.
+        max_size (int, optional): maximal total size of cached pages in bytes.
+        When exceeded, least recently used pages are evicted down to 90% of it.
+        If provided None, the size is unlimited.
+        Defaults to None.
+        offline (bool, optional): serve pages only from the cache. Defaults to False.
+    """
+
+    def __init__(self, cache_dir, ttl=None, max_size=None, offline=False):
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl
+        self.max_size = max_size
+        self.offline = offline
+        self._lock = threading.Lock()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # compute current size of the cache
+        self._size = sum(path.stat().st_size for path in self.cache_dir.glob("*/*.gz"))
+
+    def _paths(self, URL):
+        """Get paths of content and metadata files for a URL"""
+        key = hashlib.sha256(URL.encode("utf-8")).hexdigest()
+        directory = self.cache_dir / key[:2]
+        return directory / (key + ".gz"), directory / (key + ".json")
+
+    def load(self, URL):
+        """Load a cached page
+
+        Args:
+            URL (str): link to a page
+
+        Returns:
+            tuple: content (bytes) and metadata (dict) of the page or None if the page is not cached
+        """
+        content_path, meta_path = self._paths(URL)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            with gzip.open(content_path, "rb") as f:
+                content = f.read()
+            # update access time, it is used for eviction of least recently used pages
+            os.utime(content_path)
+        except (OSError, ValueError):
+            # the page may also be evicted by another thread while it is loaded
+            return None
+        return content, meta
+
+    def is_fresh(self, meta):
+        """Check whether a cached page can be served without revalidation"""
+        return self.ttl is None or time.time() - meta["checked_at"] < self.ttl
+
+    @staticmethod
+    def validators(meta):
+        """Get headers for a conditional request of a cached page
+
+        Args:
+            meta (dict): metadata of a cached page or None
+
+        Returns:
+            dict: conditional request headers
+        """
+        headers = {}
+        if meta is None:
+            return headers
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def store(self, URL, content, headers=None):
+        """Store a page in the cache
+
+        Args:
+            URL (str): link to a page
+            content (bytes): content of the page
+            headers (dict, optional): response headers. Defaults to None.
+        """
+        headers = headers or {}
+        content_path, meta_path = self._paths(URL)
+        content_path.parent.mkdir(exist_ok=True)
+        meta = {
+            "url": URL,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "checked_at": time.time(),
+            "sha256": hashlib.sha256(content).hexdigest(),
+        }
+        old_size = content_path.stat().st_size if content_path.exists() else 0
+        # write to temporary files first, so concurrent readers never see partial pages
+        tmp_suffix = ".{}.tmp".format(threading.get_ident())
+        content_tmp = content_path.with_name(content_path.name + tmp_suffix)
+        with gzip.open(content_tmp, "wb") as f:
+            f.write(content)
+        meta_tmp = meta_path.with_name(meta_path.name + tmp_suffix)
+        with open(meta_tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(content_tmp, content_path)
+        os.replace(meta_tmp, meta_path)
+        with self._lock:
+            self._size += content_path.stat().st_size - old_size
+        self._evict()
+
+    def touch(self, URL):
+        """Mark a cached page as checked, e.g. after the server has confirmed it is not modified"""
+        _, meta_path = self._paths(URL)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            # the page has been evicted since it was loaded
+            return
+        meta["checked_at"] = time.time()
+        meta_tmp = meta_path.with_name(
+            meta_path.name + ".{}.tmp".format(threading.get_ident())
+        )
+        with open(meta_tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(meta_tmp, meta_path)
+
+    def _evict(self):
+        """Remove least recently used pages when the cache exceeds max_size,
+        until it fits into the low-water mark (a share of max_size)"""
+        if self.max_size is None or self._size <= self.max_size:
+            return
+        with self._lock:
+            # another thread has already evicted pages
+            if self._size <= self.max_size:
+                return
+            low_water = self.max_size * _EVICTION_LOW_WATER
+            content_stats = []
+            for content_path in self.cache_dir.glob("*/*.gz"):
+                try:
+                    content_stats.append((content_path, content_path.stat()))
+                except FileNotFoundError:
+                    continue
+            content_stats.sort(key=lambda item: item[1].st_mtime)
+            for content_path, stat in content_stats:
+                if self._size <= low_water:
+                    break
+                content_path.unlink(missing_ok=True)
+                content_path.with_suffix(".json").unlink(missing_ok=True)
+                self._size -= stat.st_size
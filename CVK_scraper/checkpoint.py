@@ -0,0 +1,92 @@
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+
+
+class ShardStore:
+    """Checkpoint of a scrape: scraped rows of every council are written to a separate shard file,
+    and completed councils are recorded in a manifest.
+
+    A council is identified by a key (election, category, region, type of council, council).
+    The shard of a council is written before the council is added to the manifest,
+    so every council from the manifest has a complete shard.
+
+    Args:
+        directory (str or Path): directory for shards and the manifest
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.directory / "manifest.jsonl"
+        self._lock = threading.Lock()
+        self._completed = self._read_manifest()
+
+    def _read_manifest(self):
+        """Read keys of completed councils from the manifest"""
+        completed = set()
+        if not self.manifest_path.exists():
+            return completed
+        with open(self.manifest_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    completed.add(tuple(json.loads(line)))
+                except ValueError:
+                    # the last line may be incomplete if the scrape was interrupted
+                    continue
+        return completed
+
+    def _shard_path(self, key):
+        name = hashlib.sha256(json.dumps(key, ensure_ascii=False).encode("utf-8"))
+        return self.directory / (name.hexdigest() + ".json.gz")
+
+    def __len__(self):
+        return len(self._completed)
+
+    def is_completed(self, key):
+        """Check whether a council is already scraped"""
+        return tuple(key) in self._completed
+
+    def write(self, key, col_names, data):
+        """Write scraped rows of a council and mark the council as completed
+
+        Args:
+            key (tuple): key of a council (election, category, region, type of council, council)
+            col_names (list): list of column names
+            data (list): list of rows
+        """
+        shard_path = self._shard_path(key)
+        shard_tmp = shard_path.with_name(
+            shard_path.name + ".{}.tmp".format(threading.get_ident())
+        )
+        with gzip.open(shard_tmp, "wt", encoding="utf-8") as f:
+            json.dump({"columns": col_names, "rows": data}, f, ensure_ascii=False)
+        os.replace(shard_tmp, shard_path)
+        with self._lock:
+            with open(self.manifest_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(list(key), ensure_ascii=False) + "\n")
+            self._completed.add(tuple(key))
+
+    def read(self, key):
+        """Read scraped rows of a council
+
+        Args:
+            key (tuple): key of a council (election, category, region, type of council, council)
+
+        Returns:
+            tuple: list of column names and list of rows
+        """
+        with gzip.open(self._shard_path(key), "rt", encoding="utf-8") as f:
+            shard = json.load(f)
+        return shard["columns"], shard["rows"]
+
+    def clear(self):
+        """Remove all shards and the manifest"""
+        with self._lock:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._completed = set()
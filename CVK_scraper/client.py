@@ -0,0 +1,187 @@
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .metrics import record_request
+
+# statuses of responses which are retried: rate limiting and temporary errors of the server
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# exceptions which are retried: failed connections and truncated or corrupt responses
+RETRY_EXCEPTIONS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+    requests.exceptions.ContentDecodingError,
+)
+
+
+class AdaptiveLimiter:
+    """Limiter of concurrent requests with additive increase and multiplicative decrease (AIMD).
+
+    While responses are successful and faster than the target latency, the limit grows
+    by one request per response until the first congestion (slow start),
+    and then by about one request per round of requests. After an error or a 429 response the limit is halved,
+    after a slow response it is reduced by 10%. The limit is reduced at most once per cooldown,
+    so a burst of failed concurrent requests counts as a single congestion signal.
+
+    Args:
+        max_limit (int): maximal number of concurrent requests
+        min_limit (int, optional): minimal number of concurrent requests. Defaults to 1.
+        initial_limit (int, optional): initial number of concurrent requests.
+        If provided None, a half of max_limit is used. Defaults to None.
+        target_latency (float, optional): latency of a healthy response, s.
+        If provided None, latency doesn't affect the limit. Defaults to None.
+        cooldown (float, optional): minimal interval between reductions of the limit, s. Defaults to 1.
+    """
+
+    def __init__(
+        self,
+        max_limit,
+        min_limit=1,
+        initial_limit=None,
+        target_latency=None,
+        cooldown=1.0,
+    ):
+        self.max_limit = max_limit
+        self.min_limit = min(min_limit, max_limit)
+        if initial_limit is None:
+            initial_limit = max(max_limit // 2, self.min_limit)
+        self.limit = float(initial_limit)
+        self.target_latency = target_latency
+        self.cooldown = cooldown
+        self._in_flight = 0
+        self._reduced_at = float("-inf")
+        self._slow_start = True
+        self._condition = threading.Condition()
+
+    def __enter__(self):
+        with self._condition:
+            while self._in_flight >= int(self.limit):
+                self._condition.wait()
+            self._in_flight += 1
+        return self
+
+    def __exit__(self, *exc_info):
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify()
+
+    def record(self, latency, congested=False):
+        """Adjust the limit after a response
+
+        Args:
+            latency (float): latency of the response, s
+            congested (bool, optional): the request failed or was rate limited. Defaults to False.
+        """
+        with self._condition:
+            slow = self.target_latency is not None and latency > self.target_latency
+            if congested or slow:
+                now = time.monotonic()
+                if now - self._reduced_at >= self.cooldown:
+                    self._reduced_at = now
+                    self._slow_start = False
+                    factor = 0.5 if congested else 0.9
+                    self.limit = max(self.min_limit, self.limit * factor)
+            else:
+                increase = 1 if self._slow_start else 1 / self.limit
+                self.limit = min(self.max_limit, self.limit + increase)
+            self._condition.notify_all()
+
+
+class HttpClient:
+    """HTTP client shared by all fetch helpers: a pooled keep-alive session with timeouts,
+    retries with jittered exponential backoff and an adaptive limit of concurrent requests.
+
+    Args:
+        max_connections (int, optional): maximal number of connections to a host
+        (and maximal number of concurrent requests). Defaults to 8.
+        timeout (tuple, optional): timeouts of connection and reading of a response, s. Defaults to (10, 60).
+        max_retries (int, optional): number of retries after an exception from RETRY_EXCEPTIONS
+        (an error of connection, a timeout, a truncated or corrupt response)
+        or a response with a status from RETRY_STATUSES. Defaults to 5.
+        backoff_factor (float, optional): base of the delay between retries, s.
+        Delay before n-th retry is random from 0 to backoff_factor * 2**n. Defaults to 0.5.
+        backoff_max (float, optional): maximal delay between retries, s. Defaults to 30.
+        target_latency (float, optional): latency of a healthy response, s.
+        If provided None, only errors reduce concurrency. Defaults to None.
+    """
+
+    def __init__(
+        self,
+        max_connections=8,
+        timeout=(10, 60),
+        max_retries=5,
+        backoff_factor=0.5,
+        backoff_max=30.0,
+        target_latency=None,
+    ):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.limiter = AdaptiveLimiter(max_connections, target_latency=target_latency)
+        self.session = requests.Session()
+        # block instead of opening extra connections to a host over the limit
+        adapter = HTTPAdapter(
+            pool_connections=max_connections,
+            pool_maxsize=max_connections,
+            pool_block=True,
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _backoff(self, attempt, response=None):
+        """Delay before a retry: Retry-After of the response or jittered exponential backoff"""
+        retry_after = (
+            response.headers.get("Retry-After") if response is not None else None
+        )
+        if retry_after is not None and retry_after.isdigit():
+            return min(int(retry_after), self.backoff_max)
+        return random.uniform(
+            0, min(self.backoff_max, self.backoff_factor * 2**attempt)
+        )
+
+    def get(self, URL, headers=None):
+        """Send a GET request, retrying temporary failures
+
+        Args:
+            URL (str): link to a page
+            headers (dict, optional): headers of the request. Defaults to None.
+
+        Raises:
+            requests.RequestException: the request failed after all retries
+
+        Returns:
+            Response: response of the server
+        """
+        for attempt in range(self.max_retries + 1):
+            response = None
+            with self.limiter:
+                start = time.perf_counter()
+                try:
+                    response = self.session.get(
+                        URL, headers=headers, timeout=self.timeout
+                    )
+                    # read the content inside the limiter, it's a part of the request
+                    n_bytes = len(response.content)
+                except RETRY_EXCEPTIONS:
+                    # the content of a broken response isn't used
+                    response = None
+                    latency = time.perf_counter() - start
+                    self.limiter.record(latency, congested=True)
+                    record_request(latency, 0, "error")
+                    if attempt == self.max_retries:
+                        raise
+                else:
+                    latency = time.perf_counter() - start
+                    retry = response.status_code in RETRY_STATUSES
+                    self.limiter.record(latency, congested=retry)
+                    record_request(latency, n_bytes, response.status_code)
+                    if not retry:
+                        return response
+                    if attempt == self.max_retries:
+                        response.raise_for_status()
+            time.sleep(self._backoff(attempt, response))
@@ -0,0 +1,213 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+
+# Types of councils in the order of priority of a crawl.
+# Councils with a few large pages go first, village and settlement councils (the most pages) go last
+TYPES_OF_COUNCILS_PRIORITY = [
+    "Обласні",
+    "Міські",
+    "Районні",
+    "Районні у містах",
+    "Сільські, селищні",
+]
+
+
+class CrawlScheduler:
+    """Scheduler of pages of councils of a crawl.
+
+    Lists of councils are fetched lazily, only a few lists ahead of the scheduled pages, in the order
+    of priority of types of councils interleaved across regions. Pages of councils from open lists
+    are scheduled round-robin, so concurrent requests are spread over several regions. Only open lists
+    and links of scheduled pages are kept in memory. Pages are deduplicated by link,
+    so a council listed twice is scraped once.
+
+    Every page is scheduled with its position in a sequential scrape (index of its list in the
+    provided order and index in the list), so the order of a sequential scrape can be restored.
+
+    Since lists are fetched lazily, the total number of pages is known only at the end of the crawl.
+    Until then it is estimated from the sizes of opened lists (see estimated_total).
+
+    Args:
+        listings (list): list of tuples (region, type of council, link to a list of councils)
+        in the order of a sequential scrape
+        fetch_listing (callable): function which gets a dict of councils and their links by a link to a list
+        max_open_listings (int, optional): number of lists of councils which are fetched ahead. Defaults to 4.
+        on_estimate (callable, optional): function called with the estimated total number of pages
+        whenever lists of councils are opened. Defaults to None.
+    """
+
+    def __init__(self, listings, fetch_listing, max_open_listings=4, on_estimate=None):
+        self.fetch_listing = fetch_listing
+        self.max_open_listings = max(max_open_listings, 1)
+        self.on_estimate = on_estimate
+        priority = {
+            type_of_council: i
+            for i, type_of_council in enumerate(TYPES_OF_COUNCILS_PRIORITY)
+        }
+        # unknown types of councils go after known ones, keeping the provided order
+        self._listings = sorted(
+            enumerate(listings),
+            key=lambda listing: (
+                priority.get(listing[1][1], len(priority)),
+                listing[0],
+            ),
+        )
+        self._seen_links = set()
+        self.n_scheduled = 0
+        self.n_duplicates = 0
+        # number of lists which are not opened yet and numbers of opened lists and their councils
+        # by type of council
+        self._n_unopened = {}
+        for _, (_, type_of_council, _) in self._listings:
+            self._n_unopened[type_of_council] = (
+                self._n_unopened.get(type_of_council, 0) + 1
+            )
+        self._opened = {}
+
+    def estimated_total(self):
+        """Estimate the total number of scheduled pages.
+        Lists which aren't opened yet are assumed to be as long as opened lists of the same type
+        of councils (or of all types, if no list of the type is opened). The estimate is exact
+        when all lists are opened, except duplicates which aren't found yet.
+
+        Returns:
+            int: estimated number of pages or None if no list is opened yet
+        """
+        if not self._opened:
+            return None
+        n_opened = sum(n_lists for n_lists, _ in self._opened.values())
+        n_listed = sum(n_councils for _, n_councils in self._opened.values())
+        estimate = n_listed - self.n_duplicates
+        for type_of_council, n_unopened in self._n_unopened.items():
+            n_lists, n_councils = self._opened.get(
+                type_of_council, (n_opened, n_listed)
+            )
+            estimate += n_unopened * n_councils / n_lists
+        return round(estimate)
+
+    def _open_listing(self, type_of_council, n_councils):
+        """Count an opened list of councils for the estimate of the total"""
+        self._n_unopened[type_of_council] -= 1
+        n_lists, n_listed = self._opened.get(type_of_council, (0, 0))
+        self._opened[type_of_council] = (n_lists + 1, n_listed + n_councils)
+
+    def iter_councils(self, executor):
+        """Iterate over pages of councils in the order of the schedule
+
+        Args:
+            executor (Executor): executor for fetching lists of councils
+
+        Yields:
+            tuple: position of a page in a sequential scrape (index of a list, index in the list),
+            region, type of council, council and link to its page
+        """
+        listings = iter(self._listings)
+        # lists which are being fetched
+        fetching = deque()
+        # fetched lists with councils which are not scheduled yet
+        open_listings = deque()
+
+        def fetch_ahead():
+            while len(fetching) + len(open_listings) < self.max_open_listings:
+                listing = next(listings, None)
+                if listing is None:
+                    return
+                order, (region, type_of_council, URL) = listing
+                future = executor.submit(self.fetch_listing, URL)
+                fetching.append((order, region, type_of_council, future))
+
+        fetch_ahead()
+        while fetching or open_listings:
+            # open fetched lists in the order of the schedule
+            n_opened = 0
+            while fetching and (not open_listings or fetching[0][3].done()):
+                order, region, type_of_council, future = fetching.popleft()
+                councils = future.result()
+                self._open_listing(type_of_council, len(councils))
+                n_opened += 1
+                councils = iter(enumerate(councils.items()))
+                open_listings.append((order, region, type_of_council, councils))
+            if n_opened and self.on_estimate is not None:
+                self.on_estimate(self.estimated_total())
+            fetch_ahead()
+            # take one council from the first open list and move the list to the end
+            order, region, type_of_council, councils = open_listings.popleft()
+            position, council = next(councils, (None, None))
+            if council is None:
+                # the list is exhausted, fetch the next one
+                fetch_ahead()
+                continue
+            open_listings.append((order, region, type_of_council, councils))
+            council, URL = council
+            if URL in self._seen_links:
+                self.n_duplicates += 1
+                continue
+            self._seen_links.add(URL)
+            self.n_scheduled += 1
+            yield (order, position), region, type_of_council, council, URL
+
+
+def chain_future(future, func):
+    """Get a future of a function of the result of another future
+
+    Args:
+        future (Future): future of an argument of the function
+        func (callable): function called with the result of the future when it is done
+
+    Returns:
+        Future: future of the result of the function
+    """
+    chained = Future()
+
+    def set_chained(future):
+        try:
+            chained.set_result(func(future.result()))
+        except BaseException as error:
+            chained.set_exception(error)
+
+    future.add_done_callback(set_chained)
+    return chained
+
+
+def iter_bounded(executor, func, tasks, max_pending):
+    """Submit tasks to an executor lazily, keeping at most max_pending of them in flight,
+    and iterate over results in the order of completion.
+
+    A task may return a future (e.g. of a page handed over to the process pool for parsing).
+    Such a task frees its slot at once, and its result is yielded when the future is done,
+    so workers of the executor don't wait for results of other executors.
+
+    Args:
+        executor (Executor): executor for tasks
+        func (callable): function called with arguments of every task
+        tasks (iterable): iterable of tuples of arguments of tasks
+        max_pending (int): maximal number of submitted and not completed tasks
+
+    Yields:
+        tuple: arguments of a task and its result
+    """
+    tasks = iter(tasks)
+    pending = {}
+    # futures returned by completed tasks
+    chained = {}
+    exhausted = False
+    while True:
+        while not exhausted and len(pending) < max_pending:
+            task = next(tasks, None)
+            if task is None:
+                exhausted = True
+            else:
+                pending[executor.submit(func, *task)] = task
+        if not pending and not chained:
+            return
+        done, _ = wait([*pending, *chained], return_when=FIRST_COMPLETED)
+        for future in done:
+            if future in chained:
+                yield chained.pop(future), future.result()
+                continue
+            task = pending.pop(future)
+            result = future.result()
+            if isinstance(result, Future):
+                chained[result] = task
+            else:
+                yield task, result
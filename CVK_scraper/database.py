@@ -0,0 +1,393 @@
+import os
+import sqlite3
+from pathlib import Path
+
+import pandas as pd
+
+from .metrics import timer
+from .schema import apply_schema
+from .storage import iter_table
+
+# Regions, councils and parties are stored once in lookup tables and referenced by ids.
+# Views return rows with columns and in the order of data files.
+# Indexes are created after loading of data, so bulk inserts don't update them row by row
+DATABASE_SCHEMA = """
+CREATE TABLE regions (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE councils (
+    id INTEGER PRIMARY KEY,
+    region_id INTEGER NOT NULL REFERENCES regions (id),
+    type TEXT,
+    name TEXT NOT NULL,
+    UNIQUE (region_id, name)
+);
+CREATE TABLE parties (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE candidates (
+    id INTEGER PRIMARY KEY,
+    council_id INTEGER NOT NULL REFERENCES councils (id),
+    party_id INTEGER REFERENCES parties (id),
+    name TEXT,
+    district TEXT,
+    info TEXT,
+    birth_date TEXT,
+    age INTEGER,
+    education TEXT,
+    party_member INTEGER,
+    residence TEXT,
+    votes INTEGER,
+    quota_percent REAL,
+    elected_district TEXT,
+    elected INTEGER NOT NULL
+);
+CREATE TABLE aggregated (
+    id INTEGER PRIMARY KEY,
+    council_id INTEGER NOT NULL REFERENCES councils (id),
+    party_id INTEGER REFERENCES parties (id),
+    n_elected INTEGER,
+    n_nominated INTEGER
+);
+CREATE VIEW candidates_view AS
+SELECT
+    regions.name AS "Регіон",
+    councils.name AS "Рада",
+    councils.type AS "Тип ради",
+    parties.name AS "Партія",
+    candidates.district AS "ТВО/ОВО",
+    candidates.name AS "Прізвище, ім’я, по батькові",
+    candidates.info AS "Відомості",
+    candidates.birth_date AS "Дата народження",
+    candidates.age AS "Вік",
+    candidates.education AS "Освіта",
+    candidates.party_member AS "Член партії",
+    candidates.residence AS "Місце проживання",
+    candidates.votes AS "Кількість отриманих голосів",
+    candidates.quota_percent AS "% голосів від квоти",
+    candidates.elected_district AS "Виборчий округ, в якому обрано",
+    CASE candidates.elected WHEN 1 THEN 'обрано' ELSE 'не обрано' END AS "Статус"
+FROM candidates
+JOIN councils ON councils.id = candidates.council_id
+JOIN regions ON regions.id = councils.region_id
+LEFT JOIN parties ON parties.id = candidates.party_id
+ORDER BY candidates.id;
+CREATE VIEW aggregated_view AS
+SELECT
+    parties.name AS "Партія",
+    regions.name AS "Регіон",
+    councils.name AS "Рада",
+    aggregated.n_elected AS "Кількість обраних",
+    aggregated.n_nominated AS "Кількість висунутих"
+FROM aggregated
+JOIN councils ON councils.id = aggregated.council_id
+JOIN regions ON regions.id = councils.region_id
+LEFT JOIN parties ON parties.id = aggregated.party_id
+ORDER BY aggregated.id;
+"""
+DATABASE_INDEXES = """
+CREATE INDEX councils_name ON councils (name);
+CREATE INDEX candidates_council_party ON candidates (council_id, party_id);
+CREATE INDEX candidates_party_council ON candidates (party_id, council_id);
+CREATE INDEX candidates_name ON candidates (name);
+CREATE INDEX aggregated_council_party ON aggregated (council_id, party_id);
+CREATE INDEX aggregated_party_council ON aggregated (party_id, council_id);
+"""
+# columns of merged data stored in the table of candidates
+_CANDIDATES_COLUMNS = {
+    "ТВО/ОВО": "district",
+    "Прізвище, ім’я, по батькові": "name",
+    "Відомості": "info",
+    "Дата народження": "birth_date",
+    "Вік": "age",
+    "Освіта": "education",
+    "Член партії": "party_member",
+    "Місце проживання": "residence",
+    "Кількість отриманих голосів": "votes",
+    "% голосів від квоти": "quota_percent",
+    "Виборчий округ, в якому обрано": "elected_district",
+}
+# the last character of Unicode, an upper bound of strings with a prefix
+_MAX_CHAR = "\U0010ffff"
+
+
+# party membership is stored as 0 or 1 (values are strings in CSV files)
+_PARTY_MEMBER_VALUES = {True: 1, False: 0, "True": 1, "False": 0}
+
+
+def _sql_values(series):
+    """Convert a column to a list of values for SQLite (missing values are None)"""
+    values = series.astype(object)
+    return values.where(series.notna(), None).tolist()
+
+
+class _Lookups:
+    """Ids of regions, councils and parties of a database being loaded.
+    Ids are assigned in memory, new names are inserted into lookup tables in batches."""
+
+    def __init__(self):
+        self.ids = {"regions": {}, "councils": {}, "parties": {}}
+        self._new_rows = {"regions": [], "councils": [], "parties": []}
+
+    def _get_id(self, table, key, row):
+        ids = self.ids[table]
+        if key not in ids:
+            ids[key] = len(ids) + 1
+            self._new_rows[table].append((ids[key],) + row)
+        return ids[key]
+
+    def council_ids(self, data):
+        """Get ids of councils of rows of a chunk (with columns "Регіон", "Рада" and "Тип ради")"""
+        council_ids = []
+        for region, council, type_of_council in zip(
+            data["Регіон"].tolist(),
+            data["Рада"].tolist(),
+            _sql_values(data["Тип ради"]),
+        ):
+            region_id = self._get_id("regions", region, (region,))
+            council_ids.append(
+                self._get_id(
+                    "councils",
+                    (region_id, council),
+                    (region_id, council, type_of_council),
+                )
+            )
+        return council_ids
+
+    def party_ids(self, data):
+        """Get ids of parties of rows of a chunk (None for a missing party)"""
+        return [
+            None if party is None else self._get_id("parties", party, (party,))
+            for party in _sql_values(data["Партія"])
+        ]
+
+    def flush(self, connection):
+        """Insert new names into lookup tables"""
+        for table, columns in (
+            ("regions", ["name"]),
+            ("councils", ["region_id", "name", "type"]),
+            ("parties", ["name"]),
+        ):
+            if self._new_rows[table]:
+                connection.executemany(
+                    "INSERT INTO {} (id, {}) VALUES (?, {})".format(
+                        table, ", ".join(columns), ", ".join("?" * len(columns))
+                    ),
+                    self._new_rows[table],
+                )
+                self._new_rows[table] = []
+
+
+@timer("load_database")
+def load_database(database_path, merged_path, aggregated_path, chunk_rows=100_000):
+    """Load merged and aggregated data files into a SQLite database.
+
+    Regions, councils and parties are normalized into lookup tables. Data files are read by chunks,
+    every chunk is inserted in a single transaction, and indexes are created after loading.
+    The database is built in a temporary file which replaces the previous database at the end,
+    so the previous database stays available for queries during loading.
+
+    Args:
+        database_path (str or Path): path of the database
+        merged_path (str or Path): path of a file with merged data
+        aggregated_path (str or Path): path of a file with aggregated data
+        chunk_rows (int, optional): number of rows read and inserted at once. Defaults to 100000.
+
+    Raises:
+        ValueError: unsupported format of a data file
+
+    Returns:
+        dict: number of loaded rows of every table
+    """
+    database_path = Path(database_path)
+    temporary_path = database_path.with_name(database_path.name + ".tmp")
+    temporary_path.unlink(missing_ok=True)
+    connection = sqlite3.connect(temporary_path)
+    try:
+        # a crash during loading leaves only the temporary file, so durability isn't needed
+        connection.execute("PRAGMA journal_mode = OFF")
+        connection.execute("PRAGMA synchronous = OFF")
+        connection.executescript(DATABASE_SCHEMA)
+        lookups = _Lookups()
+        n_rows = {"candidates": 0, "aggregated": 0}
+        for chunk in iter_table(merged_path, chunk_rows, dtype=str):
+            chunk = apply_schema(chunk).reindex(
+                columns=["Регіон", "Рада", "Тип ради", "Партія", "Статус"]
+                + list(_CANDIDATES_COLUMNS)
+            )
+            # columns extracted from info are missing if info wasn't extracted
+            chunk = chunk.assign(
+                **{
+                    "Дата народження": chunk["Дата народження"].astype("str"),
+                    "Член партії": chunk["Член партії"].map(_PARTY_MEMBER_VALUES),
+                }
+            )
+            rows = zip(
+                lookups.council_ids(chunk),
+                lookups.party_ids(chunk),
+                *[_sql_values(chunk[col]) for col in _CANDIDATES_COLUMNS],
+                (chunk["Статус"] == "обрано").astype(int).tolist(),
+            )
+            with connection:
+                lookups.flush(connection)
+                connection.executemany(
+                    "INSERT INTO candidates (council_id, party_id, {}, elected) "
+                    "VALUES (?, ?, {}, ?)".format(
+                        ", ".join(_CANDIDATES_COLUMNS.values()),
+                        ", ".join("?" * len(_CANDIDATES_COLUMNS)),
+                    ),
+                    rows,
+                )
+            n_rows["candidates"] += len(chunk)
+        for chunk in iter_table(aggregated_path, chunk_rows, dtype=str):
+            # type of a council is known from merged data
+            chunk = chunk.assign(**{"Тип ради": None})
+            rows = zip(
+                lookups.council_ids(chunk),
+                lookups.party_ids(chunk),
+                _sql_values(pd.to_numeric(chunk["Кількість обраних"]).astype("Int64")),
+                _sql_values(
+                    pd.to_numeric(chunk["Кількість висунутих"]).astype("Int64")
+                ),
+            )
+            with connection:
+                lookups.flush(connection)
+                connection.executemany(
+                    "INSERT INTO aggregated (council_id, party_id, n_elected, n_nominated) "
+                    "VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+            n_rows["aggregated"] += len(chunk)
+        with connection:
+            connection.executescript(DATABASE_INDEXES)
+        # collect statistics of indexes for the query planner
+        connection.execute("ANALYZE")
+        for table in ("regions", "councils", "parties"):
+            n_rows[table] = len(lookups.ids[table])
+    finally:
+        connection.close()
+    os.replace(temporary_path, database_path)
+    return n_rows
+
+
+def _connect_read_only(database_path):
+    """Open a database for reading
+
+    Raises:
+        FileNotFoundError: the database doesn't exist
+    """
+    if not Path(database_path).exists():
+        raise FileNotFoundError("Бази даних не існує: {}".format(database_path))
+    return sqlite3.connect(
+        "{}?mode=ro".format(Path(database_path).resolve().as_uri()), uri=True
+    )
+
+
+def _query(database_path, view, filters, limit=None):
+    """Select rows of a view matching filters
+
+    Args:
+        database_path (str or Path): path of the database
+        view (str): name of the view
+        filters (list): list of tuples (SQL condition with placeholders, list of parameters)
+        limit (int, optional): maximal number of rows. If provided None, all rows are returned.
+
+    Returns:
+        DataFrame: selected rows
+    """
+    sql = "SELECT * FROM {}".format(view)
+    conditions = [condition for condition, _ in filters]
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    params = [param for _, condition_params in filters for param in condition_params]
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    connection = _connect_read_only(database_path)
+    try:
+        return pd.read_sql_query(sql, connection, params=params)
+    finally:
+        connection.close()
+
+
+def _lookup_filters(region=None, council=None, party=None):
+    """Conditions on names of a region, a council and a party (columns of views)"""
+    filters = []
+    if region is not None:
+        filters.append(('"Регіон" = ?', [region]))
+    if council is not None:
+        filters.append(('"Рада" = ?', [council]))
+    if party is not None:
+        filters.append(('"Партія" = ?', [party]))
+    return filters
+
+
+@timer("query_candidates")
+def query_candidates(
+    database_path,
+    region=None,
+    council=None,
+    party=None,
+    name=None,
+    status=None,
+    limit=None,
+):
+    """Query candidates from the database. Filters which are None are not applied.
+
+    Args:
+        database_path (str or Path): path of the database
+        region (str, optional): name of a region. Defaults to None.
+        council (str, optional): name of a council. Defaults to None.
+        party (str, optional): name of a party. Defaults to None.
+        name (str, optional): full name of a candidate or its beginning. Defaults to None.
+        status (str, optional): status of candidates. Possible options: "обрано", "не обрано". Defaults to None.
+        limit (int, optional): maximal number of rows. If provided None, all rows are returned.
+
+    Raises:
+        FileNotFoundError: the database doesn't exist
+
+    Returns:
+        DataFrame: candidates with columns of merged data (columns extracted from info are empty
+        if info wasn't extracted)
+    """
+    filters = _lookup_filters(region, council, party)
+    if name is not None:
+        # a range of names with the prefix can be found by the index of names
+        filters.append(
+            (
+                '"Прізвище, ім’я, по батькові" >= ? AND "Прізвище, ім’я, по батькові" < ?',
+                [name, name + _MAX_CHAR],
+            )
+        )
+    if status is not None:
+        filters.append(('"Статус" = ?', [status]))
+    candidates = _query(database_path, "candidates_view", filters, limit)
+    candidates["Член партії"] = candidates["Член партії"].astype("boolean")
+    return candidates
+
+
+@timer("query_aggregated")
+def query_aggregated(database_path, region=None, council=None, party=None, limit=None):
+    """Query aggregated data from the database. Filters which are None are not applied.
+
+    Args:
+        database_path (str or Path): path of the database
+        region (str, optional): name of a region. Defaults to None.
+        council (str, optional): name of a council. Defaults to None.
+        party (str, optional): name of a party. Defaults to None.
+        limit (int, optional): maximal number of rows. If provided None, all rows are returned.
+
+    Raises:
+        FileNotFoundError: the database doesn't exist
+
+    Returns:
+        DataFrame: aggregated data with the same columns as the aggregated data file
+    """
+    return _query(
+        database_path,
+        "aggregated_view",
+        _lookup_filters(region, council, party),
+        limit,
+    )
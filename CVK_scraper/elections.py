@@ -0,0 +1,40 @@
+from datetime import date
+
+# Registry of elections published on the CVK site.
+# Every election has a directory of the site ("site"), an id which is a part of links
+# to its pages ("id") and a date of voting ("date"). Other elections (repeat elections, by-elections)
+# are added with register_election
+ELECTIONS = {
+    "vm2020": {"site": "vm2020", "id": 695, "date": date(2020, 10, 25)},
+}
+# election which is scraped if no election is provided
+DEFAULT_ELECTION = "vm2020"
+
+
+def register_election(name, site, election_id, election_date):
+    """Add an election to the registry (or replace an election with the same name)
+
+    Args:
+        name (str): name of the election, used in options and names of directories of data
+        site (str): directory of the CVK site with the election (e.g. "vm2020")
+        election_id (int): id of the election in links of the CVK site (e.g. 695)
+        election_date (date): date of voting
+    """
+    ELECTIONS[name] = {"site": site, "id": election_id, "date": election_date}
+
+
+def get_election(name):
+    """Get an election from the registry
+
+    Args:
+        name (str): name of the election
+
+    Raises:
+        ValueError: unknown election
+
+    Returns:
+        dict: directory of the site ("site"), id ("id") and date ("date") of the election
+    """
+    if name not in ELECTIONS:
+        raise ValueError("Невідомі вибори: {}".format(name))
+    return ELECTIONS[name]
@@ -0,0 +1,117 @@
+from datetime import date
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from .metrics import timer
+
+# date of the local elections, ages of candidates are counted on this date
+ELECTION_DATE = date(2020, 10, 25)
+# columns extracted from info about candidates ("Відомості")
+INFO_COLUMNS = [
+    "Дата народження",
+    "Вік",
+    "Освіта",
+    "Член партії",
+    "Місце проживання",
+]
+
+# Info about a candidate starts with citizenship, date of birth, education and party membership:
+# "Громадянин України, народився 26.08.1983 р., освіта вища, член ПОЛІТИЧНОЇ ПАРТІЇ ..."
+# Regular expressions are evaluated by pyarrow (RE2) for the whole column at once
+_INFO_PATTERN = (
+    r"^[^,]*, народи\S* (?P<birth_date>\d{2}\.\d{2}\.\d{4}) р\., "
+    r"освіта (?P<education>[^,]+)(?:, (?P<party>член |безпартійн))?"
+)
+# ...and ends with a place of residence: "місце проживання: м. Вінниця, Вінницький р-н., Вінницька обл."
+_RESIDENCE_PATTERN = r"місце проживання: (?P<settlement>[^,]+)"
+
+
+def extracted_info_columns(columns, drop_info=False):
+    """Get columns of candidates data after extraction of info.
+    Extracted columns follow the "Відомості" column (or replace it).
+
+    Args:
+        columns (list): columns of candidates data with the "Відомості" column
+        drop_info (bool, optional): the "Відомості" column is dropped. Defaults to False.
+
+    Returns:
+        list: columns of candidates data with extracted columns
+    """
+    columns = [col for col in columns if col not in INFO_COLUMNS]
+    position = columns.index("Відомості")
+    return (
+        columns[: position + (not drop_info)] + INFO_COLUMNS + columns[position + 1 :]
+    )
+
+
+def _age(birth_dates, reference_date):
+    """Full years between dates of birth (timestamps) and the reference date"""
+    years = pc.subtract(reference_date.year, pc.year(birth_dates))
+    # the birthday of the reference year hasn't come yet
+    birthday = pc.add(pc.multiply(pc.month(birth_dates), 100), pc.day(birth_dates))
+    not_yet = pc.greater(birthday, reference_date.month * 100 + reference_date.day)
+    return pc.subtract(years, pc.cast(not_yet, pa.int64()))
+
+
+@timer("extract_info")
+def extract_info(candidates_data, drop_info=False, reference_date=ELECTION_DATE):
+    """Extract date of birth, age, education, party membership and settlement of residence
+    from info about candidates ("Відомості") into typed columns.
+
+    All columns are extracted with vectorized operations over the whole column.
+    Values which are not found in info are missing.
+
+    Args:
+        candidates_data (DataFrame): data of candidates (generated by get_candidates_info function)
+        drop_info (bool, optional): will drop the "Відомості" column after extraction. Defaults to False.
+        reference_date (date, optional): date on which ages are counted. Defaults to ELECTION_DATE.
+
+    Returns:
+        DataFrame: data of candidates with INFO_COLUMNS: "Дата народження" (date),
+        "Вік" (Int64), "Освіта" (category), "Член партії" (boolean) and "Місце проживання" (str).
+        Data without the "Відомості" column (e.g. empty data when no council has changed)
+        is returned unchanged
+    """
+    if "Відомості" not in candidates_data:
+        return candidates_data
+    # the column is empty (float) if no candidate has info
+    info = pa.array(candidates_data["Відомості"], from_pandas=True).cast(
+        pa.large_string()
+    )
+    matches = pc.extract_regex(info, _INFO_PATTERN)
+    birth_dates = pc.strptime(
+        pc.struct_field(matches, "birth_date"),
+        format="%d.%m.%Y",
+        unit="s",
+        error_is_null=True,
+    )
+    party = pc.struct_field(matches, "party")
+    # the optional group is an empty string if party membership isn't mentioned
+    is_member = pc.if_else(
+        pc.equal(party, ""),
+        pa.scalar(None, pa.bool_()),
+        pc.equal(party, "член "),
+    )
+    settlement = pc.struct_field(
+        pc.extract_regex(info, _RESIDENCE_PATTERN), "settlement"
+    )
+    nullable_types = {pa.int64(): pd.Int64Dtype(), pa.bool_(): pd.BooleanDtype()}.get
+    extracted = {
+        # dates are written to CSV files without time, even when mixed with strings
+        "Дата народження": birth_dates.cast(pa.date32()).to_pandas(
+            types_mapper=pd.ArrowDtype
+        ),
+        "Вік": _age(birth_dates, reference_date).to_pandas(types_mapper=nullable_types),
+        "Освіта": pc.struct_field(matches, "education").dictionary_encode().to_pandas(),
+        "Член партії": is_member.to_pandas(types_mapper=nullable_types),
+        "Місце проживання": settlement.to_pandas(),
+    }
+    # arrays are assigned by position
+    candidates_data = candidates_data.assign(
+        **{col: values.array for col, values in extracted.items()}
+    )
+    return candidates_data[
+        extracted_info_columns(candidates_data.columns, drop_info=drop_info)
+    ]
@@ -0,0 +1,81 @@
+import threading
+
+from .cache import PageNotCachedError
+from .client import HttpClient
+from .metrics import record_cache_hit
+
+# cache of pages shared by all fetch helpers (None means that cache is disabled)
+_page_cache = None
+# HTTP client shared by all fetch helpers (created with default settings on the first request)
+_http_client = None
+_http_client_lock = threading.Lock()
+
+
+def set_page_cache(cache):
+    """Set a cache of pages used by all fetch helpers
+
+    Args:
+        cache (PageCache): cache of pages. If provided None, cache is disabled.
+    """
+    global _page_cache
+    _page_cache = cache
+
+
+def set_http_client(client):
+    """Set an HTTP client used by all fetch helpers
+
+    Args:
+        client (HttpClient): HTTP client. If provided None, a client with default settings
+        is created on the next request.
+    """
+    global _http_client
+    _http_client = client
+
+
+def _get(URL, headers=None):
+    """Send a GET request with the shared HTTP client"""
+    global _http_client
+    if _http_client is None:
+        with _http_client_lock:
+            if _http_client is None:
+                _http_client = HttpClient()
+    return _http_client.get(URL, headers=headers)
+
+
+def fetch_page(URL):
+    """Retrieve content of a page, using the page cache if it is set.
+
+    Fresh cached pages are served without requests to the server. Expired pages are revalidated
+    with a conditional request (ETag, Last-Modified).
+
+    Args:
+        URL (str): link to a page
+
+    Raises:
+        PageNotCachedError: a page is absent in the cache in offline mode
+        requests.RequestException: the request failed after all retries
+
+    Returns:
+        bytes: content of the page
+    """
+    cache = _page_cache
+    if cache is None:
+        return _get(URL).content
+    cached = cache.load(URL)
+    content, meta = cached if cached else (None, None)
+    # serve from cache without revalidation
+    if cached and (cache.offline or cache.is_fresh(meta)):
+        record_cache_hit()
+        return content
+    if cache.offline:
+        raise PageNotCachedError("Сторінки немає в кеші: {}".format(URL))
+    # retrieve the page (conditionally, if it is cached)
+    page = _get(URL, headers=cache.validators(meta))
+    # the page is not modified since the last check
+    if cached and page.status_code == 304:
+        cache.touch(URL)
+        return content
+    # store only successfully retrieved pages
+    if page.status_code == 200:
+        cache.store(URL, page.content, page.headers)
+    return page.content
@@ -0,0 +1,174 @@
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
+
+import numpy as np
+import pandas as pd
+
+from .crawl import chain_future, iter_bounded
+from .fetch import fetch_page
+from .metrics import (
+    finish_progress,
+    record_council,
+    set_progress_total,
+    start_progress,
+)
+from .parse_pool import submit_council_people_page
+from .scrape import _build_candidates_frame, _council_records, _iter_council_paths
+
+
+def _hash_key(key):
+    """Convert a key of a council to a string key of page hashes"""
+    return json.dumps(list(key), ensure_ascii=False)
+
+
+def get_changed_candidates_info(
+    category="all",
+    regions=None,
+    types_of_councils=None,
+    max_workers=1,
+    parser="bs4",
+    page_hashes=None,
+):
+    """Get info about all or elected candidates only for councils whose pages have changed
+    since the previous run.
+
+    A content hash of every council page is recorded in page_hashes. Only pages whose hash differs
+    from the recorded one are parsed. Councils which have disappeared from the site are
+    also reported as changed (they have no rows in the output).
+
+    Args:
+        category (str, optional): category of candidates. Possible options: "all", "elected". Defaults to "all".
+        regions (list, optional): list of regions. If provided None, all regions will be scraped. Defaults to None.
+        types_of_councils (list, optional): list of types of councils. If provided None, all types of councils will be scraped.
+        Defaults to None.
+        max_workers (int, optional): number of pages fetched concurrently. Defaults to 1.
+        parser (str, optional): parser of pages. Possible options: "bs4", "lxml". Defaults to "bs4".
+        page_hashes (dict, optional): content hashes of council pages from the previous run.
+        It is updated in place. If provided None, all councils are considered changed. Defaults to None.
+
+    Raises:
+        ValueError: invalid category, parser or region provided
+
+    Returns:
+        tuple: DataFrame with candidates info of changed councils and list of keys of changed councils
+        (category, region, type of council, council)
+    """
+    # check that the category is correct
+    if category != "all" and category != "elected":
+        raise ValueError("Некоректна категорія")
+    if page_hashes is None:
+        page_hashes = {}
+
+    def scrape_council_if_changed(key, URL):
+        page = fetch_page(URL)
+        page_hash = hashlib.sha256(page).hexdigest()
+        # skip parsing of unchanged pages
+        if page_hashes.get(_hash_key(key)) == page_hash:
+            return None
+        # the fetching thread doesn't wait for parsing
+        return chain_future(
+            submit_council_people_page(page, parser),
+            lambda parsed_rows: (page_hash, parsed_rows),
+        )
+
+    # position of every council in a sequential scrape
+    council_orders = {}
+    results = {}
+
+    def council_tasks(executor):
+        for order, key, URL in _iter_council_paths(
+            category,
+            regions,
+            types_of_councils,
+            parser,
+            executor,
+            max_workers,
+            on_estimate=lambda total: set_progress_total(total, estimated=True),
+        ):
+            council_orders[key] = order
+            yield key, URL
+        set_progress_total(len(council_orders))
+
+    start_progress("Checking {} candidates".format(category))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for (key, _), result in iter_bounded(
+            executor,
+            scrape_council_if_changed,
+            council_tasks(executor),
+            2 * max_workers,
+        ):
+            # unchanged councils have no rows
+            n_rows = None if result is None else len(result[1][1])
+            record_council(key, n_rows)
+            results[key] = result
+    finish_progress()
+    records = []
+    changed_keys = []
+    # keep the order of a sequential scrape
+    for key in sorted(council_orders, key=council_orders.get):
+        result = results[key]
+        if result is None:
+            continue
+        page_hash, (col_names, data) = result
+        page_hashes[_hash_key(key)] = page_hash
+        changed_keys.append(key)
+        _, region, type_of_council, council = key
+        records.extend(
+            _council_records(region, council, type_of_council, col_names, data)
+        )
+    # councils which are no longer on the site
+    scraped_keys = {_hash_key(key) for key in council_orders}
+    for hash_key in list(page_hashes):
+        key = tuple(json.loads(hash_key))
+        if key[0] != category or hash_key in scraped_keys:
+            continue
+        # removed councils can be detected only if the same regions and types of councils are scraped
+        if (regions is None or key[1] in regions) and (
+            types_of_councils is None or key[2] in types_of_councils
+        ):
+            del page_hashes[hash_key]
+            changed_keys.append(key)
+    changed_data = _build_candidates_frame(records) if records else pd.DataFrame()
+    return changed_data, changed_keys
+
+
+def patch_groups(data, patch, groups, keys=("Регіон", "Рада")):
+    """Replace rows of the provided groups in data with rows from patch.
+
+    Rows of a patched group are placed where the group was in data, new groups are appended
+    at the end. Groups absent in patch are removed.
+
+    Args:
+        data (DataFrame): data to patch
+        patch (DataFrame): new rows of changed groups
+        groups (list): list of tuples with values of keys of changed groups
+        keys (tuple, optional): columns which define a group. Defaults to ("Регіон", "Рада").
+
+    Returns:
+        DataFrame: patched data
+    """
+    keys = list(keys)
+    if len(groups) == 0:
+        return data
+    if data.empty:
+        return patch.reset_index(drop=True)
+    data = data.reset_index(drop=True)
+    data_groups = pd.MultiIndex.from_frame(data[keys])
+    kept = data[~data_groups.isin(list(groups))]
+    if patch.empty:
+        return kept.reset_index(drop=True)
+    # position of the first row of every group in data
+    first_rows = data[keys].drop_duplicates()
+    first_positions = pd.Series(
+        first_rows.index, index=pd.MultiIndex.from_frame(first_rows)
+    )
+    patch_positions = (
+        first_positions.reindex(pd.MultiIndex.from_frame(patch[keys]))
+        .fillna(len(data))
+        .to_numpy()
+    )
+    # sort rows by positions of their groups, keeping the order of rows inside groups
+    order = np.concatenate([kept.index.to_numpy(), patch_positions])
+    patched = pd.concat([kept, patch], ignore_index=True)
+    return patched.iloc[np.argsort(order, kind="stable")].reset_index(drop=True)
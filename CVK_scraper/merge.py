@@ -1,6 +1,16 @@
+import tempfile
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
 
+from .extract import INFO_COLUMNS
+from .metrics import timer
+from .schema import apply_schema, unify_categories
+from .storage import TableWriter, iter_table, read_table, read_table_columns
+
 
+@timer("merge_candidates_info")
 def merge_candidates_info(all_candidates_data, elected_candidates_data):
     """Merge data of all and elected candidates
 
@@ -11,33 +21,153 @@ def merge_candidates_info(all_candidates_data, elected_candidates_data):
     Returns:
         DataFrame: merged data of all and elected candidates
     """
+    # merge and fill categorical columns by codes of common categories
+    all_candidates_data, elected_candidates_data = unify_categories(
+        apply_schema(all_candidates_data), apply_schema(elected_candidates_data)
+    )
     # merge data
+    # names of village and settlement councils repeat across regions, so councils are matched with regions
     merged_data = pd.merge(
         all_candidates_data,
         elected_candidates_data,
         how="outer",
-        on=["Рада", "Партія", "Прізвище, ім’я, по батькові"],
+        on=["Рада", "Регіон", "Партія", "Прізвище, ім’я, по батькові"],
         suffixes=["", "_x"],
         indicator=True,
     )
     # clean the merged DataFrame
     # fill columns from elected candidates data which is not provided in all candidates data
+    # info about candidates may be dropped after extraction of its columns
     cols_to_fill = [
-        "Регіон",
-        "Тип ради",
-        "ТВО/ОВО",
-        "Відомості",
-        "Кількість отриманих голосів",
-        "% голосів від квоти",
+        col
+        for col in [
+            "Тип ради",
+            "ТВО/ОВО",
+            "Відомості",
+            *INFO_COLUMNS,
+            "Кількість отриманих голосів",
+            "% голосів від квоти",
+        ]
+        if col in all_candidates_data.columns and col in elected_candidates_data.columns
     ]
-    for col in cols_to_fill:
-        merged_data[col].fillna(merged_data[col + "_x"], inplace=True)
+    cols_to_drop = [col + "_x" for col in cols_to_fill]
+    # coalesce all pairs of columns in one pass
+    filled_data = merged_data[cols_to_fill].fillna(
+        merged_data[cols_to_drop].set_axis(cols_to_fill, axis=1)
+    )
     # add status column using merge indicator
-    merged_data["Статус"] = merged_data.apply(
-        lambda x: "не обрано" if x["_merge"] == "left_only" else "обрано", axis=1
+    status = pd.Categorical(
+        np.where(merged_data["_merge"] == "left_only", "не обрано", "обрано"),
+        categories=["не обрано", "обрано"],
     )
     # drop unnecessary columns
-    cols_to_drop = [col + "_x" for col in cols_to_fill]
     cols_to_drop.append("_merge")
-    merged_data.drop(columns=cols_to_drop, inplace=True)
+    merged_data = merged_data.drop(columns=cols_to_drop)
+    merged_data[cols_to_fill] = filled_data
+    merged_data["Статус"] = status
     return merged_data
+
+
+def _partition_councils(council_rows, max_partition_rows):
+    """Split sorted councils into contiguous partitions of limited number of rows.
+    A council is never split, so a partition of a single council may exceed the limit.
+
+    Args:
+        council_rows (dict): number of rows of every council
+        max_partition_rows (int): maximal number of rows in a partition
+
+    Returns:
+        dict: index of a partition of every council
+    """
+    partitions = {}
+    partition = 0
+    partition_rows = 0
+    for council in sorted(council_rows):
+        if (
+            partition_rows
+            and partition_rows + council_rows[council] > max_partition_rows
+        ):
+            partition += 1
+            partition_rows = 0
+        partitions[council] = partition
+        partition_rows += council_rows[council]
+    return partitions
+
+
+@timer("merge_candidates_files")
+def merge_candidates_files(
+    all_candidates_path,
+    elected_candidates_path,
+    merged_path,
+    max_partition_rows=200_000,
+    chunk_rows=100_000,
+):
+    """Merge data of all and elected candidates from files partition by partition,
+    so only a partition of councils is in memory at once.
+
+    Councils are split into partitions of contiguous ranges of sorted names. Rows of every partition
+    are spilled to temporary files, then partitions are merged one by one and appended to
+    the output file. The result is the same as of merge_candidates_info for whole data.
+
+    Args:
+        all_candidates_path (str or Path): path of a file with data of all candidates
+        elected_candidates_path (str or Path): path of a file with data of elected candidates
+        merged_path (str or Path): path of a file for merged data
+        max_partition_rows (int, optional): maximal number of rows of both files in a partition
+        (a single council is never split). Defaults to 200000.
+        chunk_rows (int, optional): number of rows read from input files at once. Defaults to 100000.
+    """
+    paths = {"all": all_candidates_path, "elected": elected_candidates_path}
+    # count rows of every council
+    council_rows = {}
+    for path in paths.values():
+        for chunk in iter_table(path, chunk_rows, columns=["Рада"]):
+            for council, n_rows in chunk["Рада"].value_counts().items():
+                council_rows[council] = council_rows.get(council, 0) + n_rows
+    partitions = _partition_councils(council_rows, max_partition_rows)
+    n_partitions = max(partitions.values(), default=-1) + 1
+    with tempfile.TemporaryDirectory(dir=Path(merged_path).parent) as spill_dir:
+
+        def spill_path(category, partition):
+            # spilled rows are stored in the format of the input file to keep types
+            return Path(
+                spill_dir,
+                "{}_{}{}".format(category, partition, Path(paths[category]).suffix),
+            )
+
+        # spill rows of every partition to a separate file
+        for category, path in paths.items():
+            spill_writers = {}
+            # types of CSV columns are assigned by the schema during merging of a partition
+            for chunk in iter_table(path, chunk_rows, dtype=str):
+                for partition, rows in chunk.groupby(
+                    chunk["Рада"].map(partitions), sort=False
+                ):
+                    partition = int(partition)
+                    if partition not in spill_writers:
+                        spill_writers[partition] = TableWriter(
+                            spill_path(category, partition)
+                        )
+                    spill_writers[partition].write(rows)
+            for spill_writer in spill_writers.values():
+                spill_writer.close()
+        columns = {
+            category: read_table_columns(path) for category, path in paths.items()
+        }
+        with TableWriter(merged_path) as writer:
+            # partitions are ranges of sorted councils, so merged partitions are in the sorted order
+            for partition in range(max(n_partitions, 1)):
+                partition_data = {}
+                for category in paths:
+                    path = spill_path(category, partition)
+                    if path.exists():
+                        partition_data[category] = read_table(path, dtype=str)
+                    else:
+                        partition_data[category] = pd.DataFrame(
+                            columns=columns[category], dtype=str
+                        )
+                writer.write(
+                    merge_candidates_info(
+                        partition_data["all"], partition_data["elected"]
+                    )
+                )
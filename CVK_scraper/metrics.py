@@ -0,0 +1,303 @@
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+# upper bounds of buckets of the histogram of request latencies, ms
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# metrics of the current run shared by all modules (None means that metrics are disabled)
+_metrics = None
+
+
+class RunMetrics:
+    """Metrics of a run of the pipeline: timings of stages, requests, parsed pages and councils.
+    All methods are thread-safe.
+
+    Args:
+        progress (bool, optional): will show a live progress line of scraped councils. Defaults to False.
+        stream (file, optional): stream for the progress line. If provided None, stderr is used.
+        Defaults to None.
+        progress_interval (float, optional): minimal interval between updates of the progress line, s.
+        Defaults to 0.5.
+    """
+
+    def __init__(self, progress=False, stream=None, progress_interval=0.5):
+        self.progress = progress
+        self.stream = stream if stream is not None else sys.stderr
+        self.progress_interval = progress_interval
+        self._lock = threading.Lock()
+        self._started_at = datetime.now()
+        self._start = time.perf_counter()
+        # name of a timer -> [number of calls, total seconds, max seconds]
+        self._timers = {}
+        self._latencies = []
+        self._bytes_downloaded = 0
+        self._status_codes = {}
+        self._cache_hits = 0
+        self._council_rows = []
+        self._progress_label = None
+
+    def add_time(self, name, seconds):
+        """Add a measured duration to a timer"""
+        with self._lock:
+            timer = self._timers.setdefault(name, [0, 0.0, 0.0])
+            timer[0] += 1
+            timer[1] += seconds
+            timer[2] = max(timer[2], seconds)
+
+    def record_request(self, latency, n_bytes, status_code):
+        """Record a request to the server
+
+        Args:
+            latency (float): time of the request, s
+            n_bytes (int): size of the downloaded content
+            status_code (int): HTTP status code of the response
+        """
+        with self._lock:
+            self._latencies.append(latency)
+            self._bytes_downloaded += n_bytes
+            self._status_codes[status_code] = self._status_codes.get(status_code, 0) + 1
+
+    def record_cache_hit(self):
+        """Record a page served from the cache without a request"""
+        with self._lock:
+            self._cache_hits += 1
+
+    def record_council(self, key, n_rows):
+        """Record a processed page of a council
+
+        Args:
+            key (tuple): key of a council (election, category, region, type of council, council),
+            without the election for crawls of a single election (refresh, run-all --fused)
+            n_rows (int): number of rows produced for the council. None if the page wasn't parsed.
+        """
+        with self._lock:
+            if n_rows is not None:
+                self._council_rows.append((list(key), n_rows))
+            if self._progress_label is not None:
+                self._progress_done += 1
+                self._show_progress()
+
+    def start_progress(self, label):
+        """Start a progress line of councils, the total number is unknown yet"""
+        with self._lock:
+            self._progress_label = label
+            self._progress_total = None
+            self._progress_estimated = False
+            self._progress_done = 0
+            self._progress_start = time.perf_counter()
+            self._progress_shown_at = 0.0
+
+    def set_progress_total(self, total, estimated=False):
+        """Set the total number of councils of the progress line
+
+        Args:
+            total (int): number of councils. None if it can't be estimated yet
+            estimated (bool, optional): the number is an estimate, it is shown with "~".
+            Defaults to False.
+        """
+        with self._lock:
+            if self._progress_label is not None:
+                self._progress_total = total
+                self._progress_estimated = estimated
+                self._show_progress()
+
+    def finish_progress(self):
+        """Show the final state of the progress line and stop it"""
+        with self._lock:
+            if self._progress_label is not None:
+                self._show_progress(force=True)
+                if self.progress:
+                    self.stream.write("\n")
+                    self.stream.flush()
+                self._progress_label = None
+
+    def _show_progress(self, force=False):
+        if not self.progress:
+            return
+        now = time.perf_counter()
+        if not force and now - self._progress_shown_at < self.progress_interval:
+            return
+        self._progress_shown_at = now
+        elapsed = now - self._progress_start
+        done, total = self._progress_done, self._progress_total
+        rate = done / elapsed if elapsed > 0 else 0.0
+        if total is None:
+            line = "{}: {} councils, {:.1f} councils/s".format(
+                self._progress_label, done, rate
+            )
+        else:
+            # an estimated total can be exceeded before the exact one is known
+            total = max(total, done)
+            # ETA is unknown until the first council is processed
+            eta = timedelta(seconds=round((total - done) / rate)) if rate > 0 else "?"
+            approx = "~" if self._progress_estimated else ""
+            line = "{}: {}/{}{} councils ({:.0%}), {:.1f} councils/s, ETA {}{}".format(
+                self._progress_label,
+                done,
+                approx,
+                total,
+                done / total if total else 1.0,
+                rate,
+                approx,
+                eta,
+            )
+        self.stream.write("\r" + line.ljust(80))
+        self.stream.flush()
+
+    def report(self):
+        """Build a report of the collected metrics
+
+        Returns:
+            dict: report which can be serialized to JSON
+        """
+        with self._lock:
+            latencies_ms = sorted(latency * 1000 for latency in self._latencies)
+            histogram = {}
+            lower = 0
+            for upper in LATENCY_BUCKETS_MS + (None,):
+                name = (
+                    "{}+ ms".format(lower) if upper is None else "<{} ms".format(upper)
+                )
+                histogram[name] = sum(
+                    lower <= latency and (upper is None or latency < upper)
+                    for latency in latencies_ms
+                )
+                lower = upper
+            rows = [n_rows for _, n_rows in self._council_rows]
+            return {
+                "started_at": self._started_at.isoformat(timespec="seconds"),
+                "wall_time": time.perf_counter() - self._start,
+                "timers": {
+                    name: {
+                        "calls": calls,
+                        "seconds": seconds,
+                        "mean": seconds / calls,
+                        "max": max_seconds,
+                    }
+                    for name, (calls, seconds, max_seconds) in self._timers.items()
+                },
+                "requests": {
+                    "count": len(latencies_ms),
+                    "bytes_downloaded": self._bytes_downloaded,
+                    "status_codes": {
+                        str(code): count for code, count in self._status_codes.items()
+                    },
+                    "cache_hits": self._cache_hits,
+                    "latency_ms": {
+                        "mean": _mean(latencies_ms),
+                        "p50": _percentile(latencies_ms, 0.5),
+                        "p90": _percentile(latencies_ms, 0.9),
+                        "p99": _percentile(latencies_ms, 0.99),
+                        "max": latencies_ms[-1] if latencies_ms else None,
+                        "histogram": histogram,
+                    },
+                },
+                "councils": {
+                    "count": len(rows),
+                    "rows": sum(rows),
+                    "rows_per_council": {
+                        "mean": _mean(rows),
+                        "min": min(rows) if rows else None,
+                        "max": max(rows) if rows else None,
+                    },
+                    "by_council": [
+                        {"key": key, "rows": n_rows}
+                        for key, n_rows in self._council_rows
+                    ],
+                },
+            }
+
+    def dump(self, path):
+        """Write the report to a JSON file"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+
+
+def _mean(values):
+    return sum(values) / len(values) if values else None
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    return sorted_values[min(int(q * len(sorted_values)), len(sorted_values) - 1)]
+
+
+def set_metrics(metrics):
+    """Set metrics of the current run, which are recorded by all modules
+
+    Args:
+        metrics (RunMetrics): metrics of the run. If provided None, metrics are disabled.
+    """
+    global _metrics
+    _metrics = metrics
+
+
+def get_metrics():
+    """Get metrics of the current run (None if metrics are disabled)"""
+    return _metrics
+
+
+@contextmanager
+def timer(name):
+    """Measure the duration of a block of code (or a function, if used as a decorator)
+    and add it to the timer with the provided name. Does nothing if metrics are disabled.
+
+    Args:
+        name (str): name of the timer
+    """
+    metrics = _metrics
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add_time(name, time.perf_counter() - start)
+
+
+def record_request(latency, n_bytes, status_code):
+    """Record a request to the server if metrics are enabled"""
+    if _metrics is not None:
+        _metrics.record_request(latency, n_bytes, status_code)
+
+
+def record_cache_hit():
+    """Record a page served from the cache if metrics are enabled"""
+    if _metrics is not None:
+        _metrics.record_cache_hit()
+
+
+def record_council(key, n_rows):
+    """Record a processed page of a council if metrics are enabled"""
+    if _metrics is not None:
+        _metrics.record_council(key, n_rows)
+
+
+def start_progress(label):
+    """Start a progress line of councils if metrics are enabled"""
+    if _metrics is not None:
+        _metrics.start_progress(label)
+
+
+def set_progress_total(total, estimated=False):
+    """Set the total (or estimated total) number of councils of the progress line if metrics are enabled"""
+    if _metrics is not None:
+        _metrics.set_progress_total(total, estimated)
+
+
+def finish_progress():
+    """Stop the progress line if metrics are enabled"""
+    if _metrics is not None:
+        _metrics.finish_progress()
+
+
+def record_time(name, seconds):
+    """Add a duration measured elsewhere (e.g. in another process) to a timer if metrics are enabled"""
+    if _metrics is not None:
+        _metrics.add_time(name, seconds)
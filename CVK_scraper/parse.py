@@ -0,0 +1,278 @@
+from bs4 import BeautifulSoup
+from bs4.dammit import UnicodeDammit
+import lxml.etree
+import lxml.html
+
+# available parsers of pages:
+# "bs4" builds a full BeautifulSoup tree of a page,
+# "lxml" queries tables of interest directly from an lxml tree with XPath (much faster)
+PARSERS = ("bs4", "lxml")
+
+# precompiled XPath queries for the lxml parser
+# (equivalent of BeautifulSoup's find_all("table", {"class": "t2"}))
+_T2_TABLES_XPATH = lxml.etree.XPath(
+    "//table[contains(concat(' ', normalize-space(@class), ' '), ' t2 ')]"
+)
+_STRING_XPATH = lxml.etree.XPath("string()", smart_strings=False)
+_TEXTS_XPATH = lxml.etree.XPath(".//text()", smart_strings=False)
+
+
+def _check_parser(parser):
+    """Check that the parser is supported
+
+    Raises:
+        ValueError: invalid parser provided
+    """
+    if parser not in PARSERS:
+        raise ValueError("Некоректний парсер: {}".format(parser))
+
+
+def _t2_tables_lxml(content):
+    """Get all tables with class "t2" from a page using lxml
+
+    Args:
+        content (bytes): content of a page
+
+    Returns:
+        list: list of lxml elements of tables
+    """
+    # lxml can't build a tree from an empty document
+    if not content.strip():
+        return []
+    # decode the page the same way as BeautifulSoup does, so both parsers see the same text
+    markup = UnicodeDammit(content, is_html=True).unicode_markup
+    return _T2_TABLES_XPATH(lxml.html.document_fromstring(markup))
+
+
+def _text_lxml(element, separator=""):
+    """Get text of an element the same way as BeautifulSoup's get_text does"""
+    if separator:
+        return separator.join(_TEXTS_XPATH(element))
+    return _STRING_XPATH(element)
+
+
+def _parse_regional_council_paths_bs4(content, category):
+    # parse the page code
+    soup = BeautifulSoup(content, "lxml")
+    # extract the table of interest
+    table = soup.find_all("table", {"class": "t2"})[1]
+    # get rows
+    rows = table.find_all("tr")
+    # get headers
+    col_names = [td.get_text() for td in rows[0].find_all("td")]
+    # some replacements in headers
+    if category == "all":
+        col_names[2] = "Міські"
+    elif category == "elected":
+        col_names = list(map(lambda x: x.replace(" ради", ""), col_names))
+    else:
+        raise ValueError("Некоректна категорія")
+    # scrape data from the table
+    # init output dictionary
+    regional_council_paths = {}
+    # start from the third row (first 2 are headers) to the end before the total row
+    for row in rows[2:-1]:
+        cols = row.find_all("td")
+        # get region name
+        region = cols[0].get_text()
+        # init path list for region
+        path_list = []
+        start_col = 1 if category == "all" else 2
+        # iterate over columns in a row where paths can be located
+        for col in cols[start_col::2]:
+            # get path if it exists
+            a_tag = col.find("a")
+            path = None
+            if a_tag:
+                path = a_tag["href"] if a_tag.has_attr("href") else None
+            path_list.append(path)
+        # add dictionary of paths for each type of council
+        regional_council_paths[region] = dict(zip(col_names[1:-1], path_list[:-1]))
+    return regional_council_paths
+
+
+def _parse_regional_council_paths_lxml(content, category):
+    # extract the table of interest
+    table = _t2_tables_lxml(content)[1]
+    # get rows
+    rows = table.xpath(".//tr")
+    # get headers
+    col_names = [_text_lxml(td) for td in rows[0].xpath(".//td")]
+    # some replacements in headers
+    if category == "all":
+        col_names[2] = "Міські"
+    elif category == "elected":
+        col_names = [col_name.replace(" ради", "") for col_name in col_names]
+    else:
+        raise ValueError("Некоректна категорія")
+    regional_council_paths = {}
+    start_col = 1 if category == "all" else 2
+    # start from the third row (first 2 are headers) to the end before the total row
+    for row in rows[2:-1]:
+        cols = row.xpath(".//td")
+        region = _text_lxml(cols[0])
+        path_list = []
+        for col in cols[start_col::2]:
+            a_tag = col.find(".//a")
+            path_list.append(a_tag.get("href") if a_tag is not None else None)
+        regional_council_paths[region] = dict(zip(col_names[1:-1], path_list[:-1]))
+    return regional_council_paths
+
+
+def _parse_council_paths_bs4(content, category):
+    # parse the page code
+    soup = BeautifulSoup(content, "lxml")
+    # extract the table of interest
+    table = soup.find("table", {"class": "t2"})
+    # get rows
+    rows = table.find_all("tr")
+    # scrape data from the table
+    # init output dictionary
+    council_paths = {}
+    for row in rows[1:]:
+        col = row.find("td")
+        a_tag = col.find("a")
+        # get council name
+        council_name = a_tag.get_text()
+        # remove region (and district for village and settlement councils) part from a name
+        # if it's a section for elected
+        if category == "elected":
+            council_name = [x.strip() for x in council_name.split(",")][-1]
+        # get path if it exists
+        path = a_tag["href"] if a_tag.has_attr("href") else None
+        # match path for the corresponding council
+        council_paths[council_name] = path
+    return council_paths
+
+
+def _parse_council_paths_lxml(content, category):
+    # extract the table of interest
+    table = _t2_tables_lxml(content)[0]
+    council_paths = {}
+    for row in table.xpath(".//tr")[1:]:
+        a_tag = row.find(".//td").find(".//a")
+        council_name = _text_lxml(a_tag)
+        # remove region (and district for village and settlement councils) part from a name
+        # if it's a section for elected
+        if category == "elected":
+            council_name = council_name.split(",")[-1].strip()
+        council_paths[council_name] = a_tag.get("href")
+    return council_paths
+
+
+def _parse_council_people_rows_bs4(content):
+    # parse the page code
+    soup = BeautifulSoup(content, "lxml")
+    # get all tables
+    tables = soup.find_all("table", {"class": "t2"})
+    # edge case when a page is empty
+    if len(tables) == 0:
+        return [], []
+    # extract the table of interest
+    table = tables[-1]
+    # get rows
+    rows = table.find_all("tr")
+    # get headers
+    col_names = ["Партія"] + [td.get_text() for td in rows[0].find_all("td")]
+    # scrape data from the table
+    data = []
+    party = None
+    for row in rows[1:]:
+        cols = row.find_all("td")
+        # scrape party line
+        if len(cols) == 1:
+            party = cols[0].find("b").get_text()
+        else:
+            # scrape personal info
+            person_info = [party] + [
+                ele.get_text(separator=" ").strip() for ele in cols
+            ]
+            data.append(person_info)
+    # if there are no separate lines with parties, they are contained in personal info
+    if party is None:
+        col_names = col_names[1:]
+        data = [person_info[1:] for person_info in data]
+    return col_names, data
+
+
+def _parse_council_people_rows_lxml(content):
+    tables = _t2_tables_lxml(content)
+    # edge case when a page is empty
+    if len(tables) == 0:
+        return [], []
+    # extract the table of interest
+    rows = tables[-1].xpath(".//tr")
+    col_names = ["Партія"] + [_text_lxml(td) for td in rows[0].xpath(".//td")]
+    data = []
+    party = None
+    for row in rows[1:]:
+        cols = row.xpath(".//td")
+        # scrape party line
+        if len(cols) == 1:
+            party = _text_lxml(cols[0].find(".//b"))
+        else:
+            data.append([party] + [_text_lxml(ele, " ").strip() for ele in cols])
+    # if there are no separate lines with parties, they are contained in personal info
+    if party is None:
+        col_names = col_names[1:]
+        data = [person_info[1:] for person_info in data]
+    return col_names, data
+
+
+def parse_regional_council_paths(content, category, parser="bs4"):
+    """Parse link paths for each type of council for each region.
+
+    Args:
+        content (bytes): content of a page with a table with a breakdown by region and type of a council
+        category (str): category of candidates. Possible options: "all", "elected".
+        parser (str, optional): parser of pages. Possible options: "bs4", "lxml". Defaults to "bs4".
+
+    Raises:
+        ValueError: invalid category or parser provided
+
+    Returns:
+        dict: a dict where keys are regions and values are nested dictionary with a corresponding type of council and link path.
+    """
+    _check_parser(parser)
+    if parser == "lxml":
+        return _parse_regional_council_paths_lxml(content, category)
+    return _parse_regional_council_paths_bs4(content, category)
+
+
+def parse_council_paths(content, category, parser="bs4"):
+    """Parse link paths for each council
+
+    Args:
+        content (bytes): content of a page with a table with councils
+        category (str): category of candidates. Possible options: "all", "elected".
+        parser (str, optional): parser of pages. Possible options: "bs4", "lxml". Defaults to "bs4".
+
+    Raises:
+        ValueError: invalid parser provided
+
+    Returns:
+        dict: a dict where keys are councils and values are paths link
+    """
+    _check_parser(parser)
+    if parser == "lxml":
+        return _parse_council_paths_lxml(content, category)
+    return _parse_council_paths_bs4(content, category)
+
+
+def parse_council_people_rows(content, parser="bs4"):
+    """Parse personal data about candidates or elected people for a council
+
+    Args:
+        content (bytes): content of a page with a table with candidates or elected people for council
+        parser (str, optional): parser of pages. Possible options: "bs4", "lxml". Defaults to "bs4".
+
+    Raises:
+        ValueError: invalid parser provided
+
+    Returns:
+        tuple: list of column names and list of rows (each row is a list of values)
+    """
+    _check_parser(parser)
+    if parser == "lxml":
+        return _parse_council_people_rows_lxml(content)
+    return _parse_council_people_rows_bs4(content)
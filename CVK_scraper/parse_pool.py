@@ -0,0 +1,153 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from .crawl import chain_future
+from .metrics import record_time, timer
+from .parse import parse_council_people_rows
+
+# process pool for parsing of pages shared by all scrape helpers (None means that pages are parsed in-process)
+_parse_pool = None
+
+
+def _parse_people_timed(content, parser):
+    """Parse a page of a council in a worker process and measure parsing time"""
+    start = time.perf_counter()
+    col_names, data = parse_council_people_rows(content, parser)
+    # rows are shipped back as compact tuples of strings
+    return time.perf_counter() - start, col_names, [tuple(row) for row in data]
+
+
+class ParsePool:
+    """Pool of processes which parse pages of councils, so parsing isn't limited by the GIL.
+
+    Fetching threads submit raw content of pages and move on to the next pages without waiting
+    for parsed rows, so all processes are busy regardless of the number of fetching threads.
+    The number of pages submitted to the pool and not parsed yet is bounded: when the queue is full,
+    fetching threads block, so fetching can't run ahead of parsing and pages don't pile up in memory.
+
+    Args:
+        max_workers (int, optional): number of processes. If provided None, the number of CPUs is used.
+        Defaults to None.
+        max_pending (int, optional): maximal number of pages waiting for parsing or being parsed.
+        If provided None, twice the number of processes is used. Defaults to None.
+    """
+
+    def __init__(self, max_workers=None, max_pending=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 2 * self.max_workers
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        # processes are spawned, because forking of a process with running threads isn't safe
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    def submit(self, content, parser="bs4"):
+        """Submit a page of a council for parsing of personal data about candidates or elected people
+        without waiting for the result. Blocks only while the queue of the pool is full.
+
+        Args:
+            content (bytes): content of a page with a table with candidates or elected people for council
+            parser (str, optional): parser of pages. Possible options: "bs4", "lxml". Defaults to "bs4".
+
+        Returns:
+            Future: list of column names and list of rows (each row is a tuple of values).
+            Raises ValueError if an invalid parser is provided
+        """
+        # wait for a free slot in the queue of the pool
+        with timer("wait_parse_queue"):
+            self._slots.acquire()
+        try:
+            future = self._executor.submit(_parse_people_timed, content, parser)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+
+        def parsed_rows(result):
+            parse_time, col_names, data = result
+            record_time("parse_people", parse_time)
+            return col_names, data
+
+        return chain_future(future, parsed_rows)
+
+    def parse_council_people_rows(self, content, parser="bs4"):
+        """Parse personal data about candidates or elected people for a council in the pool
+
+        Args:
+            content (bytes): content of a page with a table with candidates or elected people for council
+            parser (str, optional): parser of pages. Possible options: "bs4", "lxml". Defaults to "bs4".
+
+        Raises:
+            ValueError: invalid parser provided
+
+        Returns:
+            tuple: list of column names and list of rows (each row is a tuple of values)
+        """
+        return self.submit(content, parser).result()
+
+    def close(self):
+        """Shut down processes of the pool"""
+        self._executor.shutdown(cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def set_parse_pool(pool):
+    """Set a process pool used for parsing of pages of councils
+
+    Args:
+        pool (ParsePool): pool of processes. If provided None, pages are parsed in the calling thread.
+    """
+    global _parse_pool
+    _parse_pool = pool
+
+
+def parse_council_people_page(content, parser="bs4"):
+    """Parse personal data about candidates or elected people for a council
+    with the process pool if it is set, otherwise in the calling thread.
+
+    Args:
+        content (bytes): content of a page with a table with candidates or elected people for council
+        parser (str, optional): parser of pages. Possible options: "bs4", "lxml". Defaults to "bs4".
+
+    Raises:
+        ValueError: invalid parser provided
+
+    Returns:
+        tuple: list of column names and list of rows
+    """
+    pool = _parse_pool
+    if pool is not None:
+        return pool.parse_council_people_rows(content, parser)
+    with timer("parse_people"):
+        return parse_council_people_rows(content, parser)
+
+
+def submit_council_people_page(content, parser="bs4"):
+    """Submit a page of a council for parsing of personal data about candidates or elected people
+    to the process pool if it is set, otherwise parse it in the calling thread.
+
+    Args:
+        content (bytes): content of a page with a table with candidates or elected people for council
+        parser (str, optional): parser of pages. Possible options: "bs4", "lxml". Defaults to "bs4".
+
+    Returns:
+        Future: list of column names and list of rows. Raises ValueError if an invalid parser is provided
+    """
+    pool = _parse_pool
+    if pool is not None:
+        return pool.submit(content, parser)
+    future = Future()
+    try:
+        future.set_result(parse_council_people_page(content, parser))
+    except Exception as error:
+        future.set_exception(error)
+    return future
@@ -0,0 +1,210 @@
+from concurrent.futures import ThreadPoolExecutor
+import queue
+import threading
+
+import pandas as pd
+
+from .aggregate import aggregate_by_party_region_council
+from .crawl import iter_bounded
+from .extract import extract_info, extracted_info_columns
+from .merge import merge_candidates_info
+from .metrics import finish_progress, record_council, set_progress_total, start_progress
+from .scrape import (
+    CANDIDATES_COLUMNS,
+    _build_candidates_frame,
+    _council_records,
+    _submit_council_people_rows,
+    _iter_council_paths,
+)
+
+CATEGORIES = ("all", "elected")
+# columns of merged data of the fused pipeline
+MERGED_COLUMNS = CANDIDATES_COLUMNS["all"] + [
+    col for col in CANDIDATES_COLUMNS["elected"] if col not in CANDIDATES_COLUMNS["all"]
+]
+MERGED_COLUMNS.append("Статус")
+
+
+def _candidates_frame(category, records):
+    """Build a DataFrame of a category which has at least all columns of the category"""
+    columns = CANDIDATES_COLUMNS[category]
+    candidates = _build_candidates_frame(records) if records else pd.DataFrame()
+    extra_columns = [col for col in candidates.columns if col not in columns]
+    return candidates.reindex(columns=columns + extra_columns)
+
+
+def iter_fused_candidates_info(
+    regions=None,
+    types_of_councils=None,
+    max_workers=1,
+    parser="bs4",
+    extract=False,
+    drop_info=False,
+):
+    """Scrape all and elected candidates at the same time, and merge and aggregate data of every council
+    as soon as its pages of both categories are scraped.
+
+    Both categories are crawled concurrently with a shared pool of workers in the order of the crawl
+    schedule (see CrawlScheduler). Councils which are ready
+    at the same moment are processed together as a batch. A council which is absent in one of
+    categories is processed when lists of councils of that category are fetched.
+
+    Args:
+        regions (list, optional): list of regions. If provided None, all regions will be scraped. Defaults to None.
+        types_of_councils (list, optional): list of types of councils. If provided None, all types of councils will be scraped.
+        Defaults to None.
+        max_workers (int, optional): number of pages fetched concurrently. Defaults to 1.
+        parser (str, optional): parser of pages. Possible options: "bs4", "lxml". Defaults to "bs4".
+        extract (bool, optional): will extract columns from info about candidates (see extract_info).
+        Defaults to False.
+        drop_info (bool, optional): will drop info about candidates after extraction. Defaults to False.
+
+    Raises:
+        ValueError: invalid parser or region provided
+
+    Yields:
+        dict: data of a batch of councils: "all" and "elected" (scraped data), "merged" (merged data
+        with MERGED_COLUMNS and extracted columns) and "aggregated" (aggregated data)
+    """
+    events = queue.Queue()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+
+        def crawl(category):
+            """Scrape pages of councils of a category and report all of them at the end"""
+            keys = []
+
+            def scrape_council(key, URL):
+                return _submit_council_people_rows(URL, parser)
+
+            def council_tasks():
+                for _, key, URL in _iter_council_paths(
+                    category,
+                    regions,
+                    types_of_councils,
+                    parser,
+                    executor,
+                    max_workers,
+                    on_estimate=lambda total: events.put(("estimate", category, total)),
+                ):
+                    keys.append(key)
+                    yield key, URL
+
+            try:
+                # both categories are crawled in the same order,
+                # so a council is scraped in both of them at about the same time
+                for (key, _), result in iter_bounded(
+                    executor, scrape_council, council_tasks(), 2 * max_workers
+                ):
+                    events.put(("council", key, result))
+                events.put(("enumerated", category, keys))
+            except Exception as error:
+                events.put(("error", category, error))
+
+        start_progress("Scraping all and elected candidates")
+        for category in CATEGORIES:
+            threading.Thread(target=crawl, args=(category,), daemon=True).start()
+        # councils are matched by region, type of council and name
+        pending = {}
+        enumerated = {}
+        # estimated numbers of councils of categories which aren't enumerated yet
+        estimates = {}
+        n_scraped = 0
+        try:
+            while len(enumerated) < len(CATEGORIES) or n_scraped < sum(
+                len(keys) for keys in enumerated.values()
+            ):
+                # handle all events which have already happened
+                batch_events = [events.get()]
+                while True:
+                    try:
+                        batch_events.append(events.get_nowait())
+                    except queue.Empty:
+                        break
+                for kind, subject, value in batch_events:
+                    if kind == "error":
+                        raise value
+                    if kind == "estimate":
+                        estimates[subject] = value
+                        set_progress_total(
+                            sum(
+                                (
+                                    len(enumerated[category])
+                                    if category in enumerated
+                                    else estimates.get(category, 0)
+                                )
+                                for category in CATEGORIES
+                            ),
+                            estimated=True,
+                        )
+                        continue
+                    if kind == "enumerated":
+                        enumerated[subject] = {key[1:] for key in value}
+                        if len(enumerated) == len(CATEGORIES):
+                            set_progress_total(
+                                sum(len(keys) for keys in enumerated.values())
+                            )
+                        continue
+                    col_names, data = value
+                    record_council(subject, len(data))
+                    n_scraped += 1
+                    pending.setdefault(subject[1:], {})[subject[0]] = (col_names, data)
+                # a council is ready if it's scraped in every category where it exists
+                ready = [
+                    council_key
+                    for council_key, scraped in pending.items()
+                    if all(
+                        category in scraped
+                        or (
+                            category in enumerated
+                            and council_key not in enumerated[category]
+                        )
+                        for category in CATEGORIES
+                    )
+                ]
+                if ready:
+                    yield _process_batch(
+                        [(key, pending.pop(key)) for key in ready], extract, drop_info
+                    )
+        except BaseException:
+            # don't wait for pages which are not needed anymore
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        finally:
+            finish_progress()
+
+
+def _process_batch(councils, extract=False, drop_info=False):
+    """Merge and aggregate data of a batch of councils
+
+    Args:
+        councils (list): list of tuples (key of a council (region, type of council, council),
+        dict of scraped column names and rows of every category)
+        extract (bool, optional): will extract columns from info about candidates. Defaults to False.
+        drop_info (bool, optional): will drop info about candidates after extraction. Defaults to False.
+
+    Returns:
+        dict: scraped, merged and aggregated data of the batch
+    """
+    records = {category: [] for category in CATEGORIES}
+    for (region, type_of_council, council), scraped in councils:
+        for category, (col_names, data) in scraped.items():
+            records[category].extend(
+                _council_records(region, council, type_of_council, col_names, data)
+            )
+    batch = {
+        category: _candidates_frame(category, records[category])
+        for category in CATEGORIES
+    }
+    merged_columns = MERGED_COLUMNS
+    if extract:
+        batch = {
+            category: extract_info(data, drop_info=drop_info)
+            for category, data in batch.items()
+        }
+        merged_columns = extracted_info_columns(MERGED_COLUMNS, drop_info=drop_info)
+    merged_data = merge_candidates_info(batch["all"], batch["elected"])
+    # keep the same columns in every batch
+    extra_columns = [col for col in merged_data.columns if col not in merged_columns]
+    batch["merged"] = merged_data.reindex(columns=merged_columns + extra_columns)
+    batch["aggregated"] = aggregate_by_party_region_council(batch["merged"])
+    return batch
@@ -0,0 +1,66 @@
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# low-cardinality columns stored as categories
+CATEGORICAL_COLUMNS = ["Регіон", "Рада", "Тип ради", "Партія", "Статус", "Освіта"]
+# numeric columns of candidates and aggregated data and their nullable types
+NUMERIC_COLUMNS = {
+    "Кількість отриманих голосів": "Int64",
+    "% голосів від квоти": "Float64",
+    "Вік": "Int64",
+    "Кількість обраних": "Int64",
+    "Кількість висунутих": "Int64",
+}
+
+
+def apply_schema(data):
+    """Convert columns of candidates data to types of the schema.
+    Columns absent in the schema are left as is.
+
+    Args:
+        data (DataFrame): candidates data
+
+    Returns:
+        DataFrame: candidates data with categorical and nullable numeric columns
+    """
+    dtypes = {}
+    for col in data.columns:
+        if col in CATEGORICAL_COLUMNS:
+            dtypes[col] = "category"
+        elif col in NUMERIC_COLUMNS:
+            dtypes[col] = NUMERIC_COLUMNS[col]
+    # values which are not numbers (e.g. empty strings) become NA
+    numeric_data = {
+        col: pd.to_numeric(data[col], errors="coerce")
+        for col in data.columns
+        if col in NUMERIC_COLUMNS and data[col].dtype.kind not in "iuf"
+    }
+    return data.assign(**numeric_data).astype(dtypes)
+
+
+def unify_categories(left, right):
+    """Set the same categories in categorical columns which are present in both DataFrames,
+    so they can be merged and combined by codes of categories.
+
+    Args:
+        left (DataFrame): first DataFrame
+        right (DataFrame): second DataFrame
+
+    Returns:
+        tuple: both DataFrames with unified categories
+    """
+    common_columns = [
+        col
+        for col in left.columns.intersection(right.columns)
+        if isinstance(left[col].dtype, pd.CategoricalDtype)
+        and isinstance(right[col].dtype, pd.CategoricalDtype)
+    ]
+    dtypes = {
+        col: pd.CategoricalDtype(
+            union_categoricals(
+                [left[col], right[col]], ignore_order=True, sort_categories=True
+            ).categories
+        )
+        for col in common_columns
+    }
+    return left.astype(dtypes), right.astype(dtypes)
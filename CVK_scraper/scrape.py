@@ -1,23 +1,39 @@
-import requests
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
 
-CVK_BASE_URL = "https://www.cvk.gov.ua/pls/vm2020/"
+from .crawl import CrawlScheduler, iter_bounded
+from .elections import DEFAULT_ELECTION, get_election
+from .fetch import fetch_page
+from .metrics import (
+    finish_progress,
+    record_council,
+    set_progress_total,
+    start_progress,
+    timer,
+)
+from .parse import parse_council_paths, parse_regional_council_paths
+from .parse_pool import parse_council_people_page, submit_council_people_page
+from .schema import apply_schema
+
+# links are templates filled with a directory of the site ("site") and an id ("id") of an election
+CVK_BASE_URL = "https://www.cvk.gov.ua/pls/{site}/"
 REGIONS_PATH = {
-    "all": "pvm008pt001f01=695pt00_t001f01=695.html",
-    "elected": "pvm002pt001f01=695pt00_t001f01=695.html",
+    "all": "pvm008pt001f01={id}pt00_t001f01={id}.html",
+    "elected": "pvm002pt001f01={id}pt00_t001f01={id}.html",
 }
 
 
-def _get_regional_council_paths(URL, category):
+def _get_regional_council_paths(URL, category, parser="bs4"):
     """Get link paths for each type of council for each region.
 
     Args:
         URL (str): link to a page with a table with a breakdown by region and type of a council
         category (str): category of candidates. Possible options: "all", "elected".
+        parser (str, optional): parser of pages. Possible options: "bs4", "lxml". Defaults to "bs4".
 
     Raises:
-        ValueError: invalid category provided
+        ValueError: invalid category or parser provided
 
     Returns:
         dict: a dict where keys are regions and values are nested dictionary with a corresponding type of council and link path.
@@ -34,52 +50,19 @@ def _get_regional_council_paths(URL, category):
 
     """
     # retrieve the source page
-    page = requests.get(URL)
+    page = fetch_page(URL)
     # parse the page code
-    soup = BeautifulSoup(page.content, "lxml")
-    # extract the table of interest
-    table = soup.find_all("table", {"class": "t2"})[1]
-    # get rows
-    rows = table.find_all("tr")
-    # get headers
-    col_names = [td.get_text() for td in rows[0].find_all("td")]
-    # some replacements in headers
-    if category == "all":
-        col_names[2] = "Міські"
-    elif category == "elected":
-        col_names = list(map(lambda x: x.replace(" ради", ""), col_names))
-    else:
-        raise ValueError("Некоректна категорія")
-    # scrape data from the table
-    # init output dictionary
-    regional_council_paths = {}
-    # start from the third row (first 2 are headers) to the end before the total row
-    for row in rows[2:-1]:
-        cols = row.find_all("td")
-        # get region name
-        region = cols[0].get_text()
-        # init path list for region
-        path_list = []
-        start_col = 1 if category == "all" else 2
-        # iterate over columns in a row where paths can be located
-        for col in cols[start_col::2]:
-            # get path if it exists
-            a_tag = col.find("a")
-            path = None
-            if a_tag:
-                path = a_tag["href"] if a_tag.has_attr("href") else None
-            path_list.append(path)
-        # add dictionary of paths for each type of council
-        regional_council_paths[region] = dict(zip(col_names[1:-1], path_list[:-1]))
-    return regional_council_paths
-
-
-def _get_council_paths(URL, category):
+    with timer("parse_regions"):
+        return parse_regional_council_paths(page, category, parser)
+
+
+def _get_council_paths(URL, category, parser="bs4"):
     """Get link paths for each council
 
     Args:
         URL (str): link to a page with a table with councils
         category (str): category of candidates. Possible options: "all", "elected".
+        parser (str, optional): parser of pages. Possible options: "bs4", "lxml". Defaults to "bs4".
 
     Returns:
         dict: a dict where keys are regions and values are paths link
@@ -92,152 +75,411 @@ def _get_council_paths(URL, category):
 
     """
     # retrieve the source page
-    page = requests.get(URL)
+    page = fetch_page(URL)
     # parse the page code
-    soup = BeautifulSoup(page.content, "lxml")
-    # extract the table of interest
-    table = soup.find("table", {"class": "t2"})
-    # get rows
-    rows = table.find_all("tr")
-    # scrape data from the table
-    # init output dictionary
-    council_paths = {}
-    for row in rows[1:]:
-        col = row.find("td")
-        a_tag = col.find("a")
-        # get council name
-        council_name = a_tag.get_text()
-        # remove region part from a name if it's a section for elected
-        if category == "elected":
-            council_name = [x.strip() for x in council_name.split(",")][1]
-        # get path if it exists
-        path = a_tag["href"] if a_tag.has_attr("href") else None
-        # match path for the corresponding council
-        council_paths[council_name] = path
-    return council_paths
-
-
-def _get_council_people_data(URL):
+    with timer("parse_councils"):
+        return parse_council_paths(page, category, parser)
+
+
+# renaming of columns which differ between categories of candidates and types of councils
+COLUMNS_RENAMING = {
+    "№ ОВО": "ТВО/ОВО",
+    "№ ТВО, за яким закріплено": "ТВО/ОВО",
+    "Прізвище, ім'я, по батькові": "Прізвище, ім’я, по батькові",
+    "Висування": "Партія",
+    "% від квоти": "% голосів від квоти",
+    "Відомості про обраного депутата": "Відомості",
+    "Голосів ЗА": "Кількість отриманих голосів",
+}
+
+
+# columns of scraped data of every category (data of a council may lack some of them)
+CANDIDATES_COLUMNS = {
+    "all": [
+        "Регіон",
+        "Рада",
+        "Тип ради",
+        "Партія",
+        "ТВО/ОВО",
+        "Прізвище, ім’я, по батькові",
+        "Відомості",
+        "Кількість отриманих голосів",
+        "% голосів від квоти",
+    ],
+    "elected": [
+        "Регіон",
+        "Рада",
+        "Тип ради",
+        "Партія",
+        "ТВО/ОВО",
+        "Прізвище, ім’я, по батькові",
+        "Відомості",
+        "Кількість отриманих голосів",
+        "% голосів від квоти",
+        "Виборчий округ, в якому обрано",
+    ],
+}
+
+
+def _get_council_people_rows(URL, parser="bs4"):
+    """Get personal data about candidates or elected people for a council as raw rows
+
+    Args:
+        URL (str): link to a page with a table with candidates or elected people for council
+        parser (str, optional): parser of pages. Possible options: "bs4", "lxml". Defaults to "bs4".
+
+    Returns:
+        tuple: list of column names and list of rows (each row is a list of values)
+    """
+    # retrieve the source page
+    page = fetch_page(URL)
+    # parse the page code (in the process pool if it is set)
+    return parse_council_people_page(page, parser)
+
+
+def _submit_council_people_rows(URL, parser="bs4"):
+    """Get a page of a council and submit it for parsing without waiting for raw rows
+
+    Args:
+        URL (str): link to a page with a table with candidates or elected people for council
+        parser (str, optional): parser of pages. Possible options: "bs4", "lxml". Defaults to "bs4".
+
+    Returns:
+        Future: list of column names and list of rows
+    """
+    # retrieve the source page
+    page = fetch_page(URL)
+    # parse the page code (in the process pool if it is set)
+    return submit_council_people_page(page, parser)
+
+
+def _get_council_people_data(URL, parser="bs4"):
     """Get personal data about candidates or elected people for a council
 
     Args:
         URL (str): link to a page with a table with candidates or elected people for council
+        parser (str, optional): parser of pages. Possible options: "bs4", "lxml". Defaults to "bs4".
 
     Returns:
         DataFrame: DataFrame with scraped data
     """
-    # retrieve the source page
-    page = requests.get(URL)
-    # parse the page code
-    soup = BeautifulSoup(page.content, "lxml")
-    # get all tables
-    tables = soup.find_all("table", {"class": "t2"})
+    col_names, data = _get_council_people_rows(URL, parser)
     # edge case when a page is empty
-    if len(tables) == 0:
+    if len(col_names) == 0:
         return pd.DataFrame()
-    # extract the table of interest
-    table = tables[-1]
-    # get rows
-    rows = table.find_all("tr")
-    # get headers
-    col_names = ["Партія"] + [td.get_text() for td in rows[0].find_all("td")]
-    # scrape data from the table
-    data = []
-    party = None
-    for row in rows[1:]:
-        cols = row.find_all("td")
-        # scrape party line
-        if len(cols) == 1:
-            party = cols[0].find("b").get_text()
-        else:
-            # scrape personal info
-            person_info = [party] + [
-                ele.get_text(separator=" ").strip() for ele in cols
-            ]
-            data.append(person_info)
-    # convert to DataFrame
-    people_data = pd.DataFrame(data, columns=col_names)
-    # if there are no separate lines with parties, they are contained in personal info
-    if party is None:
-        people_data.drop(columns="Партія", inplace=True)
-    return people_data
-
-
-def get_candidates_info(category="all", regions=None, types_of_councils=None):
-    """Get info about all or elected candidates for specified regions and types of councils
+    return pd.DataFrame(data, columns=col_names)
+
+
+def _council_records(region, council, type_of_council, col_names, data):
+    """Convert scraped rows of a council to records
 
     Args:
-        category (str, optional): category of candidates. Possible options: "all", "elected". Defaults to "all".
-        regions (list, optional): list of regions. If provided None, all regions will be scraped. Defaults to None.
-        types_of_councils (list, optional): list of types of councils. If provided None, all types of councils will be scraped.
+        region (str): region of a council
+        council (str): name of a council
+        type_of_council (str): type of a council
+        col_names (list): list of column names
+        data (list): list of rows
+
+    Returns:
+        list: list of dicts, one per candidate
+    """
+    # unify names of columns
+    col_names = [COLUMNS_RENAMING.get(col, col) for col in col_names]
+    records = []
+    for person_info in data:
+        record = {"Регіон": region, "Рада": council, "Тип ради": type_of_council}
+        record.update(zip(col_names, person_info))
+        records.append(record)
+    return records
+
+
+@timer("build_candidates_frame")
+def _build_candidates_frame(records, columns=None):
+    """Build a DataFrame with candidates info from scraped records
+
+    Args:
+        records (list): list of dicts, one per candidate
+        columns (list, optional): columns of the DataFrame if there are no records
+        (e.g. an election has none of the provided regions), so it can be written and read back.
         Defaults to None.
 
+    Returns:
+        DataFrame: DataFrame with candidates info
+    """
+    candidates = pd.DataFrame.from_records(
+        records, columns=None if records else columns
+    )
+    # change comma delimeter to decimal point
+    if "% голосів від квоти" in candidates:
+        candidates["% голосів від квоти"] = candidates[
+            "% голосів від квоти"
+        ].str.replace(",", ".")
+    # convert columns to categorical and nullable numeric types
+    return apply_schema(candidates)
+
+
+def _check_regions(regions, known_regions):
+    """Check that all provided regions are known
+
+    Args:
+        regions (list): list of regions
+        known_regions (iterable): regions on the CVK site
+
     Raises:
-        ValueError: invalid category provided
+        ValueError: unknown region
+    """
+    unknown_regions = [region for region in regions if region not in known_regions]
+    if unknown_regions:
+        raise ValueError("Невідомі регіони: {}".format(", ".join(unknown_regions)))
 
-    Returns:
-        DataFrame: scraped DataFrame with candidates info
+
+def _iter_council_paths(
+    category,
+    regions,
+    types_of_councils,
+    parser,
+    executor,
+    max_open_listings=4,
+    election=DEFAULT_ELECTION,
+    on_estimate=None,
+    skip_missing_regions=False,
+):
+    """Iterate over link paths of councils in the order of the crawl schedule (see CrawlScheduler).
+    Lists of councils are fetched lazily with the provided executor.
+
+    Args:
+        category (str): category of candidates. Possible options: "all", "elected".
+        regions (list): list of regions. If provided None, all regions will be scraped.
+        types_of_councils (list): list of types of councils. If provided None, all types of councils will be scraped.
+        parser (str): parser of pages. Possible options: "bs4", "lxml".
+        executor (Executor): executor for fetching lists of councils
+        max_open_listings (int, optional): number of lists of councils which are fetched ahead. Defaults to 4.
+        election (str, optional): name of an election (see ELECTIONS). Defaults to DEFAULT_ELECTION.
+        on_estimate (callable, optional): function called with the estimated total number of councils
+        whenever lists of councils are opened (see CrawlScheduler). Defaults to None.
+        skip_missing_regions (bool, optional): will skip regions which are absent in the election
+        (e.g. regions of other crawled elections) instead of raising an error. Defaults to False.
+
+    Raises:
+        ValueError: unknown election or region
+
+    Yields:
+        tuple: position of a council in a sequential scrape, key of a council
+        (category, region, type of council, council) and link to its page
     """
-    # check that the category is correct
-    if category != "all" and category != "elected":
-        raise ValueError("Некоректна категорія")
+    election = get_election(election)
+    base_URL = CVK_BASE_URL.format(**election)
     # get all link paths for provided category
     regional_council_paths = _get_regional_council_paths(
-        CVK_BASE_URL + REGIONS_PATH[category], category
+        base_URL + REGIONS_PATH[category].format(**election), category, parser
     )
     # get all available regions
     all_regions = list(regional_council_paths.keys())
     # if regions argument is empty, scrape all regions
     if regions is None:
         regions = all_regions
-    # if there are no types of councils, scrape all
-    # TO DO: add support for 'сільскі' та 'селищні'
+    elif skip_missing_regions:
+        # repeat elections and by-elections are held only in some regions
+        regions = [region for region in regions if region in regional_council_paths]
+    else:
+        _check_regions(regions, all_regions)
+    # if there are no types of councils, scrape all (including village and settlement councils)
     if types_of_councils is None:
         types_of_councils = list(regional_council_paths[all_regions[0]].keys())
-    # init final DataFrame
-    candidates_full = pd.DataFrame()
-    # scrape data for each region
-    for region in regions:
-        # init DataFrame for region
-        candidates_region = pd.DataFrame()
-        # scrape data for each provided council
-        for type_of_council in types_of_councils:
-            # get link path for corresponding region and type of council
-            regional_councils_path = regional_council_paths[region][type_of_council]
-            # if path exist, get all council paths
-            if regional_councils_path:
-                councils_paths = _get_council_paths(
-                    CVK_BASE_URL + regional_councils_path, category
+    # select links to lists of councils for each region and type of council
+    listings = [
+        (
+            region,
+            type_of_council,
+            base_URL + regional_council_paths[region][type_of_council],
+        )
+        for region in regions
+        for type_of_council in types_of_councils
+        if regional_council_paths[region].get(type_of_council)
+    ]
+    scheduler = CrawlScheduler(
+        listings,
+        lambda URL: _get_council_paths(URL, category, parser),
+        max_open_listings=max_open_listings,
+        on_estimate=on_estimate,
+    )
+    for order, region, type_of_council, council, URL in scheduler.iter_councils(
+        executor
+    ):
+        yield order, (category, region, type_of_council, council), base_URL + URL
+
+
+def get_candidates_info(
+    category="all",
+    regions=None,
+    types_of_councils=None,
+    max_workers=1,
+    parser="bs4",
+    checkpoint=None,
+    election=DEFAULT_ELECTION,
+):
+    """Get info about all or elected candidates for specified regions and types of councils
+
+    Pages with lists of councils and pages with candidates are fetched concurrently in the order
+    of the crawl schedule, with a bounded number of pages in flight,
+    but the order of rows in the output is the same as in a sequential scrape.
+
+    If a checkpoint is provided, rows of every council are written to its shard as soon as
+    the council is scraped, councils which are already completed in the checkpoint are skipped,
+    and the output is compacted from shards at the end.
+
+    Args:
+        category (str, optional): category of candidates. Possible options: "all", "elected". Defaults to "all".
+        regions (list, optional): list of regions. If provided None, all regions will be scraped. Defaults to None.
+        types_of_councils (list, optional): list of types of councils. If provided None, all types of councils will be scraped.
+        Defaults to None.
+        max_workers (int, optional): number of pages fetched concurrently. Defaults to 1.
+        parser (str, optional): parser of pages. Possible options: "bs4", "lxml". Defaults to "bs4".
+        checkpoint (ShardStore, optional): checkpoint for resumable scraping. Defaults to None.
+        election (str, optional): name of an election (see ELECTIONS). Defaults to DEFAULT_ELECTION.
+
+    Raises:
+        ValueError: invalid category, parser, election or region provided
+
+    Returns:
+        DataFrame: scraped DataFrame with candidates info
+    """
+    return get_elections_candidates_info(
+        category=category,
+        elections=[election],
+        regions=regions,
+        types_of_councils=types_of_councils,
+        max_workers=max_workers,
+        parser=parser,
+        checkpoint=checkpoint,
+    )[election]
+
+
+def get_elections_candidates_info(
+    category="all",
+    elections=(DEFAULT_ELECTION,),
+    regions=None,
+    types_of_councils=None,
+    max_workers=1,
+    parser="bs4",
+    checkpoint=None,
+):
+    """Get info about all or elected candidates of several elections in a single crawl.
+
+    Elections are crawled one after another with a shared pool of workers: lists of councils
+    of the next election are fetched as soon as all pages of the previous one are scheduled,
+    so the number of pages in flight doesn't drop between elections.
+    Councils are identified by keys (election, category, region, type of council, council),
+    also in the checkpoint. A provided region is skipped in elections where it is absent,
+    but it must be present in at least one of them. See get_candidates_info for details.
+
+    Args:
+        category (str, optional): category of candidates. Possible options: "all", "elected". Defaults to "all".
+        elections (list, optional): list of names of elections (see ELECTIONS). Defaults to (DEFAULT_ELECTION,).
+        regions (list, optional): list of regions. If provided None, all regions will be scraped. Defaults to None.
+        types_of_councils (list, optional): list of types of councils. If provided None, all types of councils will be scraped.
+        Defaults to None.
+        max_workers (int, optional): number of pages fetched concurrently. Defaults to 1.
+        parser (str, optional): parser of pages. Possible options: "bs4", "lxml". Defaults to "bs4".
+        checkpoint (ShardStore, optional): checkpoint for resumable scraping. Defaults to None.
+
+    Raises:
+        ValueError: invalid category, parser, election or region provided
+
+    Returns:
+        dict: scraped DataFrames with candidates info. Key is a name of an election
+    """
+    # check that the category is correct
+    if category != "all" and category != "elected":
+        raise ValueError("Некоректна категорія")
+    # check that all elections are known before the crawl
+    for election in elections:
+        get_election(election)
+    # a region may be absent in some of the elections, but it must be present in at least one
+    skip_missing_regions = regions is not None and len(elections) > 1
+    if skip_missing_regions:
+        known_regions = set()
+        for election in elections:
+            election_info = get_election(election)
+            base_URL = CVK_BASE_URL.format(**election_info)
+            known_regions.update(
+                _get_regional_council_paths(
+                    base_URL + REGIONS_PATH[category].format(**election_info),
+                    category,
+                    parser,
                 )
-                # scrape candidates info for each council
-                for council, path in councils_paths.items():
-                    candidates = _get_council_people_data(CVK_BASE_URL + path)
-                    # rename some columns
-                    candidates.rename(
-                        columns={
-                            "№ ОВО": "ТВО/ОВО",
-                            "№ ТВО, за яким закріплено": "ТВО/ОВО",
-                            "Прізвище, ім'я, по батькові": "Прізвище, ім’я, по батькові",
-                            "Висування": "Партія",
-                            "% від квоти": "% голосів від квоти",
-                            "Відомості про обраного депутата": "Відомості",
-                            "Голосів ЗА": "Кількість отриманих голосів",
-                        },
-                        inplace=True,
-                    )
-                    # add column "Рада" і "Тип ради"
-                    candidates.insert(0, "Рада", council)
-                    candidates.insert(1, "Тип ради", type_of_council)
-                    # append to regional DataFrame
-                    candidates_region = candidates_region.append(candidates)
-        # add region column
-        candidates_region.insert(0, "Регіон", region)
-        # append to full DataFrame
-        candidates_full = candidates_full.append(candidates_region)
-    # change comma delimeter to decimal point
-    candidates_full["% голосів від квоти"] = candidates_full[
-        "% голосів від квоти"
-    ].str.replace(",", ".")
-    # convert columns to numeric type where possible
-    candidates_full = candidates_full.apply(pd.to_numeric, errors="ignore")
-    return candidates_full
\ No newline at end of file
+            )
+        _check_regions(regions, known_regions)
+
+    def scrape_council(key, URL):
+        # the fetching thread doesn't wait for parsing
+        return _submit_council_people_rows(URL, parser)
+
+    # position of every council in a sequential scrape of its election
+    council_orders = {}
+    results = {}
+
+    def council_tasks(executor):
+        n_tasks = 0
+        for election in elections:
+            # councils of the election listed so far
+            n_listed = 0
+
+            def estimate_total(n_councils):
+                # councils of the next elections aren't known yet
+                remaining = max(n_councils - n_listed, 0)
+                set_progress_total(n_tasks + remaining, estimated=True)
+
+            for order, key, URL in _iter_council_paths(
+                category,
+                regions,
+                types_of_councils,
+                parser,
+                executor,
+                max_workers,
+                election=election,
+                on_estimate=estimate_total,
+                skip_missing_regions=skip_missing_regions,
+            ):
+                n_listed += 1
+                key = (election,) + key
+                council_orders[key] = order
+                # skip councils which are already scraped
+                if checkpoint is not None and checkpoint.is_completed(key):
+                    continue
+                n_tasks += 1
+                yield key, URL
+        set_progress_total(n_tasks)
+
+    start_progress("Scraping {} candidates".format(category))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # as soon as a list of councils is ready, schedule pages of its councils,
+        # keeping a bounded number of pages in flight
+        for (key, _), (col_names, data) in iter_bounded(
+            executor, scrape_council, council_tasks(executor), 2 * max_workers
+        ):
+            record_council(key, len(data))
+            if checkpoint is None:
+                results[key] = col_names, data
+            else:
+                # keep only one council in memory, the rest is in shards
+                checkpoint.write(key, col_names, data)
+    finish_progress()
+    # collect rows of all councils of every election into one list of records
+    # in the order of a sequential scrape
+    records = {election: [] for election in elections}
+    for key in sorted(council_orders, key=council_orders.get):
+        result = results.get(key)
+        election, _, region, type_of_council, council = key
+        # with a checkpoint, rows are compacted from shards
+        col_names, data = result if checkpoint is None else checkpoint.read(key)
+        records[election].extend(
+            _council_records(region, council, type_of_council, col_names, data)
+        )
+    # build the final DataFrames at once
+    return {
+        election: _build_candidates_frame(
+            election_records, columns=CANDIDATES_COLUMNS[category]
+        )
+        for election, election_records in records.items()
+    }
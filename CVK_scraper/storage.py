@@ -0,0 +1,175 @@
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .metrics import timer
+
+# available formats of data files (format is defined by an extension of a file)
+STORAGE_FORMATS = ("csv", "parquet")
+
+
+def _storage_format(path):
+    """Get format of a data file from its extension
+
+    Raises:
+        ValueError: unsupported format of a file
+    """
+    storage_format = Path(path).suffix.lstrip(".").lower()
+    if storage_format not in STORAGE_FORMATS:
+        raise ValueError("Непідтримуваний формат файлу: {}".format(path))
+    return storage_format
+
+
+@timer("read_table")
+def read_table(path, columns=None, dtype=None):
+    """Read a data file
+
+    Args:
+        path (str or Path): path of a file. Format is defined by the extension: ".csv" or ".parquet".
+        columns (list, optional): list of columns to read. If provided None, all columns will be read.
+        Defaults to None.
+        dtype (str or dict, optional): types of columns of CSV files (Parquet files keep their types).
+        If provided None, types are inferred. Defaults to None.
+
+    Raises:
+        ValueError: unsupported format of a file
+
+    Returns:
+        DataFrame: data from the file
+    """
+    if _storage_format(path) == "parquet":
+        return pd.read_parquet(path, columns=columns)
+    return pd.read_csv(path, usecols=columns, dtype=dtype, low_memory=False)
+
+
+@timer("write_table")
+def write_table(data, path):
+    """Write data to a file
+
+    In Parquet files strings are dictionary-encoded and numeric columns keep their types.
+
+    Args:
+        data (DataFrame): data to write
+        path (str or Path): path of a file. Format is defined by the extension: ".csv" or ".parquet".
+
+    Raises:
+        ValueError: unsupported format of a file
+    """
+    if _storage_format(path) == "parquet":
+        # columns with mixed values (e.g. numbers and strings after merging) are stored as strings
+        object_columns = data.select_dtypes(include="object").columns
+        data = data.astype({col: "string" for col in object_columns})
+        data.to_parquet(path, index=False, use_dictionary=True)
+    else:
+        data.to_csv(path, index=False)
+
+
+def read_table_columns(path):
+    """Read names of columns of a data file
+
+    Args:
+        path (str or Path): path of a file. Format is defined by the extension: ".csv" or ".parquet".
+
+    Raises:
+        ValueError: unsupported format of a file
+
+    Returns:
+        list: names of columns
+    """
+    if _storage_format(path) == "parquet":
+        return pq.read_schema(path).names
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def iter_table(path, chunk_rows=100_000, columns=None, dtype=None):
+    """Read a data file by chunks of rows
+
+    Args:
+        path (str or Path): path of a file. Format is defined by the extension: ".csv" or ".parquet".
+        chunk_rows (int, optional): maximal number of rows in a chunk. Defaults to 100000.
+        columns (list, optional): list of columns to read. If provided None, all columns will be read.
+        Defaults to None.
+        dtype (str or dict, optional): types of columns of CSV files (Parquet files keep their types).
+        If provided None, types are inferred for every chunk. Defaults to None.
+
+    Raises:
+        ValueError: unsupported format of a file
+
+    Yields:
+        DataFrame: chunk of data from the file
+    """
+    if _storage_format(path) == "parquet":
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas()
+        return
+    with pd.read_csv(
+        path, usecols=columns, dtype=dtype, chunksize=chunk_rows
+    ) as reader:
+        for chunk in reader:
+            yield chunk
+
+
+class TableWriter:
+    """Writer of a data file by chunks of rows. Can be used as a context manager.
+
+    All chunks must have the same columns as the first one. In Parquet files
+    categorical and string columns are stored as dictionary-encoded strings.
+
+    Args:
+        path (str or Path): path of a file. Format is defined by the extension: ".csv" or ".parquet".
+
+    Raises:
+        ValueError: unsupported format of a file
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.format = _storage_format(path)
+        self._columns = None
+        self._written = False
+        self._parquet_writer = None
+
+    @timer("write_table")
+    def write(self, data):
+        """Append a chunk of rows to the file
+
+        Args:
+            data (DataFrame): chunk of data
+        """
+        if self._columns is None:
+            self._columns = list(data.columns)
+        data = data[self._columns]
+        if self.format == "parquet":
+            # chunks may have different categories, so categories are stored as strings
+            string_columns = data.select_dtypes(include=["object", "category"]).columns
+            data = data.astype({col: "string" for col in string_columns})
+            table = pa.Table.from_pandas(data, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(
+                    self.path, table.schema, use_dictionary=True
+                )
+            self._parquet_writer.write_table(table.cast(self._parquet_writer.schema))
+        else:
+            # the file isn't kept open, so many files can be written at once
+            data.to_csv(
+                self.path,
+                mode="a" if self._written else "w",
+                header=not self._written,
+                index=False,
+            )
+        self._written = True
+
+    def close(self):
+        """Finish writing of the file"""
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
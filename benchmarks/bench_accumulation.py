@@ -0,0 +1,110 @@
+"""Benchmark of accumulation of scraped councils into a DataFrame.
+
+Compares the previous approach (appending a DataFrame of every council to the accumulated one)
+with building the DataFrame at once from a list of records.
+
+Run from the root of the repository:
+    python -m benchmarks.bench_accumulation
+"""
+
+import time
+
+import pandas as pd
+
+from CVK_scraper.schema import apply_schema
+from CVK_scraper.scrape import COLUMNS_RENAMING, _build_candidates_frame
+
+COL_NAMES = [
+    "Партія",
+    "№ ТВО, за яким закріплено",
+    "Прізвище, ім'я, по батькові",
+    "Відомості",
+    "Голосів ЗА",
+    "% від квоти",
+]
+CANDIDATES_PER_COUNCIL = 40
+COUNCILS_PER_REGION = 50
+
+
+def _synthetic_councils(n_councils):
+    """Generate synthetic scraped councils in the format of _get_council_people_rows"""
+    for i in range(n_councils):
+        data = [
+            [
+                "Партія {}".format(j % 8),
+                str(j % 5 + 1),
+                "Кандидат {} {}".format(i, j),
+                "Громадянин України, народився 01.01.1980 р., освіта вища",
+                str(100 + j),
+                "{},{}".format(j % 100, j % 10),
+            ]
+            for j in range(CANDIDATES_PER_COUNCIL)
+        ]
+        region = "Регіон {}".format(i // COUNCILS_PER_REGION)
+        yield region, "Рада {}".format(i), "Міські", COL_NAMES, data
+
+
+def accumulate_by_appending(councils):
+    """Previous approach: a DataFrame per council appended to the accumulated DataFrame"""
+    candidates_full = pd.DataFrame()
+    candidates_region = pd.DataFrame()
+    current_region = None
+    for region, council, type_of_council, col_names, data in councils:
+        if region != current_region:
+            if current_region is not None:
+                candidates_region.insert(0, "Регіон", current_region)
+                candidates_full = pd.concat([candidates_full, candidates_region])
+            candidates_region = pd.DataFrame()
+            current_region = region
+        candidates = pd.DataFrame(data, columns=col_names)
+        candidates.rename(columns=COLUMNS_RENAMING, inplace=True)
+        candidates.insert(0, "Рада", council)
+        candidates.insert(1, "Тип ради", type_of_council)
+        # DataFrame.append is a wrapper around concat of two frames
+        candidates_region = pd.concat([candidates_region, candidates])
+    candidates_region.insert(0, "Регіон", current_region)
+    candidates_full = pd.concat([candidates_full, candidates_region])
+    candidates_full["% голосів від квоти"] = candidates_full[
+        "% голосів від квоти"
+    ].str.replace(",", ".")
+    return apply_schema(candidates_full)
+
+
+def accumulate_records(councils):
+    """Current approach: a list of records converted to a DataFrame at once"""
+    records = []
+    for region, council, type_of_council, col_names, data in councils:
+        col_names = [COLUMNS_RENAMING.get(col, col) for col in col_names]
+        for person_info in data:
+            record = {"Регіон": region, "Рада": council, "Тип ради": type_of_council}
+            record.update(zip(col_names, person_info))
+            records.append(record)
+    return _build_candidates_frame(records)
+
+
+def _timeit(func, councils):
+    start = time.perf_counter()
+    result = func(councils)
+    return time.perf_counter() - start, result
+
+
+def main():
+    print(
+        "{:>10} {:>14} {:>14} {:>9}".format(
+            "councils", "append, s", "records, s", "speedup"
+        )
+    )
+    for n_councils in (10, 100, 1000):
+        councils = list(_synthetic_councils(n_councils))
+        append_time, appended = _timeit(accumulate_by_appending, councils)
+        records_time, built = _timeit(accumulate_records, councils)
+        assert len(appended) == len(built) == n_councils * CANDIDATES_PER_COUNCIL
+        print(
+            "{:>10} {:>14.3f} {:>14.3f} {:>8.1f}x".format(
+                n_councils, append_time, records_time, append_time / records_time
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
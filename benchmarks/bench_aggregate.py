@@ -0,0 +1,90 @@
+"""Benchmark of aggregation of candidates data by party, region and council.
+
+Compares the previous implementation of aggregate_by_party_region_council (a boolean mask over
+the aggregated data for every council without data on nominated candidates)
+with the current vectorized one. Outputs are compared as written CSV files.
+
+Run from the root of the repository:
+    python -m benchmarks.bench_aggregate
+"""
+
+import time
+
+import pandas as pd
+
+from CVK_scraper.aggregate import aggregate_by_party_region_council
+from CVK_scraper.merge import merge_candidates_info
+
+from .bench_merge import synthetic_candidates
+
+
+def aggregate_by_party_region_council_loop(candidates_data):
+    """Previous implementation of aggregate_by_party_region_council"""
+    aggregated_data = (
+        candidates_data.groupby(["Партія", "Регіон", "Рада"], as_index=False)
+        .agg(
+            {
+                "Статус": lambda x: (x == "обрано").sum(),
+                "Прізвище, ім’я, по батькові": "count",
+            }
+        )
+        .rename(
+            columns={
+                "Статус": "Кількість обраних",
+                "Прізвище, ім’я, по батькові": "Кількість висунутих",
+            }
+        )
+    )
+    councils_nominated_equal_elected = (
+        aggregated_data.groupby(["Регіон", "Рада"], as_index=False)
+        .agg({"Кількість обраних": "sum", "Кількість висунутих": "sum"})
+        .query("`Кількість обраних` == `Кількість висунутих`")
+    )
+    # older pandas upcast the column to object when NA was assigned
+    aggregated_data["Кількість висунутих"] = aggregated_data[
+        "Кількість висунутих"
+    ].astype(object)
+    for i in range(len(councils_nominated_equal_elected)):
+        aggregated_data.loc[
+            (aggregated_data["Регіон"] == councils_nominated_equal_elected.iloc[i, 0])
+            & (aggregated_data["Рада"] == councils_nominated_equal_elected.iloc[i, 1]),
+            "Кількість висунутих",
+        ] = pd.NA
+    return aggregated_data
+
+
+def _timeit(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    print(
+        "{:>10} {:>10} {:>10} {:>13}".format(
+            "councils", "rows", "loop, s", "vectorized, s"
+        )
+    )
+    for n_councils in (150, 500, 1500):
+        all_data, elected_data = synthetic_candidates(n_councils * 300)
+        merged_data = merge_candidates_info(all_data, elected_data)
+        # a third of councils don't provide data on nominated candidates
+        councils = merged_data["Рада"].unique()
+        only_elected = merged_data["Рада"].isin(councils[::3])
+        merged_data = merged_data[~only_elected | (merged_data["Статус"] == "обрано")]
+        loop_time, expected = _timeit(
+            aggregate_by_party_region_council_loop, merged_data
+        )
+        vectorized_time, result = _timeit(
+            aggregate_by_party_region_council, merged_data
+        )
+        assert result.to_csv(index=False) == expected.to_csv(index=False)
+        print(
+            "{:>10} {:>10} {:>10.2f} {:>13.2f}".format(
+                len(councils), len(merged_data), loop_time, vectorized_time
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Benchmark of the SQLite database of merged and aggregated data.
+
+Synthetic national merged and aggregated data are written to CSV files and loaded into a database.
+Then common lookups (candidates of a party in a council, a party across regions, a candidate
+by name, aggregated data of a council) are answered by the database and by reading
+the CSV file of merged data with a scan; results must be identical.
+
+Run from the root of the repository:
+    python -m benchmarks.bench_database [NUMBER_OF_ROWS]
+"""
+
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from CVK_scraper.aggregate import aggregate_by_party_region_council
+from CVK_scraper.database import load_database, query_aggregated, query_candidates
+from CVK_scraper.merge import merge_candidates_info
+from CVK_scraper.storage import read_table, write_table
+
+from .bench_merge import synthetic_candidates
+
+
+def _normalize(data):
+    """Convert data to strings as in CSV files, so results of both sides are comparable"""
+    return pd.read_csv(io.StringIO(data.to_csv(index=False)), dtype=str).reset_index(
+        drop=True
+    )
+
+
+def _timeit(func, repeat=5):
+    """Best time of a function, ms, and its result"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as data_dir:
+        merged_path = Path(data_dir, "merged.csv")
+        aggregated_path = Path(data_dir, "aggregated.csv")
+        database_path = Path(data_dir, "candidates.sqlite")
+        merged_data = merge_candidates_info(*synthetic_candidates(n_rows))
+        write_table(merged_data, merged_path)
+        write_table(aggregate_by_party_region_council(merged_data), aggregated_path)
+        sample = merged_data.iloc[len(merged_data) // 2]
+        del merged_data
+
+        start = time.perf_counter()
+        n_loaded = load_database(database_path, merged_path, aggregated_path)
+        print(
+            "Loaded {} candidates and {} aggregated rows in {:.2f} s".format(
+                n_loaded["candidates"],
+                n_loaded["aggregated"],
+                time.perf_counter() - start,
+            )
+        )
+        region, council, party = sample["Регіон"], sample["Рада"], sample["Партія"]
+        name = sample["Прізвище, ім’я, по батькові"]
+        lookups = {
+            "party in a council": (
+                lambda: query_candidates(
+                    database_path, region=region, council=council, party=party
+                ),
+                lambda data: (data["Регіон"] == region)
+                & (data["Рада"] == council)
+                & (data["Партія"] == party),
+            ),
+            "party across regions": (
+                lambda: query_candidates(database_path, party=party),
+                lambda data: data["Партія"] == party,
+            ),
+            "candidate by name": (
+                lambda: query_candidates(database_path, name=name),
+                lambda data: data["Прізвище, ім’я, по батькові"].str.startswith(
+                    name, na=False
+                ),
+            ),
+        }
+        print(
+            "{:<22} {:>6} {:>10} {:>10}".format(
+                "lookup", "rows", "SQLite, ms", "CSV, ms"
+            )
+        )
+        for lookup, (query, mask) in lookups.items():
+            database_time, result = _timeit(query)
+            csv_time, expected = _timeit(
+                lambda: (lambda data: data[mask(data)])(read_table(merged_path)),
+                repeat=1,
+            )
+            # synthetic data has no columns extracted from info
+            pd.testing.assert_frame_equal(
+                _normalize(result[expected.columns]), _normalize(expected)
+            )
+            print(
+                "{:<22} {:>6} {:>10.1f} {:>10.1f}".format(
+                    lookup, len(result), database_time, csv_time
+                )
+            )
+        database_time, result = _timeit(
+            lambda: query_aggregated(database_path, region=region, council=council)
+        )
+        aggregated_data = read_table(aggregated_path)
+        expected = aggregated_data[
+            (aggregated_data["Регіон"] == region) & (aggregated_data["Рада"] == council)
+        ]
+        pd.testing.assert_frame_equal(_normalize(result), _normalize(expected))
+        print(
+            "{:<22} {:>6} {:>10.1f} {:>10}".format(
+                "aggregated of council", len(result), database_time, "-"
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
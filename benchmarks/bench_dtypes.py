@@ -0,0 +1,67 @@
+"""Memory report of candidates data with and without the schema of column types.
+
+Compares memory usage of synthetic national datasets where repeated strings are stored as plain
+strings and as categories (see CVK_scraper.schema), and times merging and aggregation on them.
+
+Run from the root of the repository:
+    python -m benchmarks.bench_dtypes [NUMBER_OF_ROWS]
+"""
+
+import sys
+import time
+
+from CVK_scraper.aggregate import aggregate_by_party_region_council
+from CVK_scraper.merge import merge_candidates_info
+from CVK_scraper.schema import CATEGORICAL_COLUMNS, apply_schema
+
+from .bench_merge import synthetic_candidates
+
+
+def _memory_mb(data):
+    return data.memory_usage(deep=True).sum() / 1024**2
+
+
+def _timeit(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def _print_memory(name, plain, typed):
+    print(
+        "{:<24} {:>10.1f} {:>10.1f} {:>9.1f}x".format(
+            name,
+            _memory_mb(plain),
+            _memory_mb(typed),
+            _memory_mb(plain) / _memory_mb(typed),
+        )
+    )
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    all_data, elected_data = synthetic_candidates(n_rows)
+    typed_all_data = apply_schema(all_data)
+    typed_elected_data = apply_schema(elected_data)
+    merged_data = merge_candidates_info(typed_all_data, typed_elected_data)
+    # the same merged data where categories are converted back to strings
+    # (synthetic data has no columns extracted from info)
+    plain_merged_data = merged_data.astype(
+        {col: str for col in CATEGORICAL_COLUMNS if col in merged_data}
+    )
+
+    print(
+        "{:<24} {:>10} {:>10} {:>10}".format("memory, MB", "strings", "schema", "ratio")
+    )
+    _print_memory("all candidates", all_data, typed_all_data)
+    _print_memory("elected candidates", elected_data, typed_elected_data)
+    _print_memory("merged candidates", plain_merged_data, merged_data)
+
+    merge_time, _ = _timeit(merge_candidates_info, typed_all_data, typed_elected_data)
+    aggregate_time, _ = _timeit(aggregate_by_party_region_council, merged_data)
+    print("merge:     {:.2f} s".format(merge_time))
+    print("aggregate: {:.2f} s".format(aggregate_time))
+
+
+if __name__ == "__main__":
+    main()
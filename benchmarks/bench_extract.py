@@ -0,0 +1,160 @@
+"""Benchmark of extraction of columns from info about candidates ("Відомості").
+
+Compares extract_info (regular expressions over the whole column in pyarrow) with parsing
+of info row by row with Python regular expressions on synthetic biographies in the format
+of the CVK site, checks that results are the same and shows sizes of a CSV file
+with and without the raw text of info.
+
+Run from the root of the repository:
+    python -m benchmarks.bench_extract [NUMBER_OF_ROWS]
+"""
+
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from CVK_scraper.extract import ELECTION_DATE, INFO_COLUMNS, extract_info
+from CVK_scraper.storage import write_table
+
+EDUCATION_LEVELS = [
+    "вища",
+    "професійно-технічна",
+    "загальна середня",
+    "повна загальна середня",
+    "середня спеціальна",
+]
+
+
+def synthetic_info(n_rows, seed=0):
+    """Generate synthetic data of candidates with info in the format of the CVK site"""
+    rng = np.random.default_rng(seed)
+    gender = rng.random(n_rows) < 0.5
+    days = rng.integers(1, 29, n_rows)
+    months = rng.integers(1, 13, n_rows)
+    years = rng.integers(1940, 2001, n_rows)
+    education = rng.choice(EDUCATION_LEVELS, n_rows)
+    parties = rng.integers(0, 30, n_rows)
+    is_member = rng.random(n_rows) < 0.4
+    settlements = rng.integers(0, 3000, n_rows)
+    info = [
+        "{}, {} {:02d}.{:02d}.{} р., освіта {}, {}, "
+        'ТОВ "Підприємство {}", директор, місце проживання: {} Населений пункт {}, '
+        "Район {} р-н, Регіон {} обл.".format(
+            "Громадянка України" if gender[i] else "Громадянин України",
+            "народилася" if gender[i] else "народився",
+            days[i],
+            months[i],
+            years[i],
+            education[i],
+            (
+                'член Політичної партії "Партія {}"'.format(parties[i])
+                if is_member[i]
+                else ("безпартійна" if gender[i] else "безпартійний")
+            ),
+            i,
+            "с." if settlements[i] % 3 else "м.",
+            settlements[i],
+            settlements[i] % 100,
+            settlements[i] % 25,
+        )
+        for i in range(n_rows)
+    ]
+    # info of some candidates is not provided
+    info = pd.Series(info, dtype="str")
+    info[::50] = np.nan
+    return pd.DataFrame(
+        {
+            "Партія": ["Партія {}".format(i) for i in parties],
+            "Прізвище, ім’я, по батькові": [
+                "Кандидат {}".format(i) for i in range(n_rows)
+            ],
+            "Відомості": info,
+            "Кількість отриманих голосів": rng.integers(0, 3000, n_rows),
+        }
+    )
+
+
+_ROW_PATTERN = re.compile(
+    r"^[^,]*, народи\S* (\d{2})\.(\d{2})\.(\d{4}) р\., освіта ([^,]+)(?:, (член |безпартійн))?"
+)
+_ROW_RESIDENCE_PATTERN = re.compile(r"місце проживання: ([^,]+)")
+
+
+def extract_info_rowwise(candidates_data):
+    """Parsing of info row by row, as done by users of data files"""
+    rows = []
+    for info in candidates_data["Відомості"]:
+        row = [None] * len(INFO_COLUMNS)
+        match = _ROW_PATTERN.match(info) if isinstance(info, str) else None
+        if match:
+            day, month, year, education, party = match.groups()
+            birth_date = pd.Timestamp(int(year), int(month), int(day)).date()
+            age = ELECTION_DATE.year - birth_date.year
+            if (birth_date.month, birth_date.day) > (
+                ELECTION_DATE.month,
+                ELECTION_DATE.day,
+            ):
+                age -= 1
+            row[:4] = [birth_date, age, education, party and party == "член "]
+        residence = (
+            _ROW_RESIDENCE_PATTERN.search(info) if isinstance(info, str) else None
+        )
+        if residence:
+            row[4] = residence.group(1)
+        rows.append(row)
+    return candidates_data.join(
+        pd.DataFrame(rows, columns=INFO_COLUMNS, index=candidates_data.index)
+    )
+
+
+def _as_objects(data):
+    """Convert extracted columns to Python objects with None as a missing value"""
+    data = data[INFO_COLUMNS].astype(object)
+    return data.where(data.notna(), None)
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    candidates_data = synthetic_info(n_rows)
+    start = time.perf_counter()
+    rowwise_data = extract_info_rowwise(candidates_data)
+    rowwise_time = time.perf_counter() - start
+    start = time.perf_counter()
+    extracted_data = extract_info(candidates_data)
+    vectorized_time = time.perf_counter() - start
+    pd.testing.assert_frame_equal(
+        _as_objects(extracted_data), _as_objects(rowwise_data)
+    )
+    print("{} rows, results are equal".format(n_rows))
+    print(
+        "row by row: {:.2f} s ({:.0f} rows/s)".format(
+            rowwise_time, n_rows / rowwise_time
+        )
+    )
+    print(
+        "vectorized: {:.2f} s ({:.0f} rows/s)".format(
+            vectorized_time, n_rows / vectorized_time
+        )
+    )
+    print("speedup: {:.1f}x".format(rowwise_time / vectorized_time))
+    with tempfile.TemporaryDirectory() as data_dir:
+        for label, data in (
+            ("without extraction", candidates_data),
+            ("with extracted columns", extracted_data),
+            (
+                "extracted columns without info",
+                extract_info(candidates_data, drop_info=True),
+            ),
+        ):
+            path = Path(data_dir, "candidates.csv")
+            write_table(data, path)
+            print("CSV file {}: {:.1f} MB".format(label, path.stat().st_size / 1024**2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Benchmark of merging data of all and elected candidates.
+
+Compares the previous implementation of merge_candidates_info (status assigned with a row-wise
+apply, columns filled one by one) with the current vectorized one on a synthetic national dataset.
+
+Run from the root of the repository:
+    python -m benchmarks.bench_merge [NUMBER_OF_ROWS]
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from CVK_scraper.merge import merge_candidates_info
+
+COLS_TO_FILL = [
+    "Регіон",
+    "Тип ради",
+    "ТВО/ОВО",
+    "Відомості",
+    "Кількість отриманих голосів",
+    "% голосів від квоти",
+]
+
+
+def synthetic_candidates(n_rows, elected_share=0.3, seed=0):
+    """Generate synthetic data of all and elected candidates
+
+    Returns:
+        tuple: DataFrames of all and elected candidates
+    """
+    rng = np.random.default_rng(seed)
+    n_councils = max(n_rows // 300, 1)
+    council_ids = rng.integers(0, n_councils, n_rows)
+    all_data = pd.DataFrame(
+        {
+            "Регіон": ["Регіон {}".format(i % 25) for i in council_ids],
+            "Рада": ["Рада {}".format(i) for i in council_ids],
+            "Тип ради": np.where(council_ids % 5 == 0, "Районні", "Міські"),
+            "Партія": ["Партія {}".format(i) for i in rng.integers(0, 30, n_rows)],
+            "ТВО/ОВО": rng.integers(1, 10, n_rows),
+            "Прізвище, ім’я, по батькові": [
+                "Кандидат {}".format(i) for i in range(n_rows)
+            ],
+            "Відомості": "Громадянин України, народився 01.01.1980 р., освіта вища",
+            "Кількість отриманих голосів": rng.integers(0, 3000, n_rows),
+            "% голосів від квоти": rng.random(n_rows) * 150,
+        }
+    )
+    elected_data = all_data.sample(frac=elected_share, random_state=seed).copy()
+    elected_data["Виборчий округ, в якому обрано"] = "ЄБВО"
+    # some elected candidates are absent in the data of all candidates
+    all_data = all_data.drop(elected_data.index[: len(elected_data) // 10])
+    # some columns of all candidates are not provided
+    all_data.loc[all_data.index[::7], ["ТВО/ОВО", "Відомості"]] = np.nan
+    return all_data.reset_index(drop=True), elected_data.reset_index(drop=True)
+
+
+def merge_candidates_info_rowwise(all_candidates_data, elected_candidates_data):
+    """Previous implementation of merge_candidates_info"""
+    merged_data = pd.merge(
+        all_candidates_data,
+        elected_candidates_data,
+        how="outer",
+        on=["Рада", "Партія", "Прізвище, ім’я, по батькові"],
+        suffixes=["", "_x"],
+        indicator=True,
+    )
+    for col in COLS_TO_FILL:
+        # inplace fillna on a column doesn't work with Copy-on-Write, assign instead
+        merged_data[col] = merged_data[col].fillna(merged_data[col + "_x"])
+    merged_data["Статус"] = merged_data.apply(
+        lambda x: "не обрано" if x["_merge"] == "left_only" else "обрано", axis=1
+    )
+    cols_to_drop = [col + "_x" for col in COLS_TO_FILL]
+    cols_to_drop.append("_merge")
+    merged_data.drop(columns=cols_to_drop, inplace=True)
+    return merged_data
+
+
+def _timeit(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    all_data, elected_data = synthetic_candidates(n_rows)
+    rowwise_time, expected = _timeit(
+        merge_candidates_info_rowwise, all_data, elected_data
+    )
+    vectorized_time, result = _timeit(merge_candidates_info, all_data, elected_data)
+    pd.testing.assert_frame_equal(
+        result.astype(object), expected.astype(object), check_dtype=False
+    )
+    print("Merged {} + {} rows".format(len(all_data), len(elected_data)))
+    print("row-wise:   {:.2f} s".format(rowwise_time))
+    print("vectorized: {:.2f} s".format(vectorized_time))
+    print("speedup:    {:.1f}x".format(rowwise_time / vectorized_time))
+
+
+if __name__ == "__main__":
+    main()
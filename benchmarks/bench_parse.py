@@ -0,0 +1,181 @@
+"""Equivalence check and throughput benchmark of parsers of pages.
+
+Every page is parsed by all parsers from CVK_scraper.parse.PARSERS; the outputs must be identical.
+Then parse throughput (pages/sec) of each parser is measured, in-process and in a pool
+of processes (CVK_scraper.parse_pool.ParsePool) with 1, 2, 4, ... processes up to the number of CPUs,
+which shows how parsing of pages of councils scales across cores.
+
+Pages are generated by the synthetic site. Saved pages of the real CVK site can be checked too:
+put them into a directory with names starting with the kind of a page
+("regions-all", "regions-elected", "councils-all", "councils-elected", "people")
+and pass the directory as an argument.
+
+Run from the root of the repository:
+    python -m benchmarks.bench_parse [DIRECTORY_WITH_SAVED_PAGES]
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from CVK_scraper.parse import (
+    PARSERS,
+    parse_council_paths,
+    parse_council_people_rows,
+    parse_regional_council_paths,
+)
+from CVK_scraper.parse_pool import ParsePool
+
+from .synthetic_site import TYPES_OF_COUNCILS, SyntheticSite
+
+PARSE_FUNCTIONS = {
+    "regions-all": lambda content, parser: parse_regional_council_paths(
+        content, "all", parser
+    ),
+    "regions-elected": lambda content, parser: parse_regional_council_paths(
+        content, "elected", parser
+    ),
+    "councils-all": lambda content, parser: parse_council_paths(content, "all", parser),
+    "councils-elected": lambda content, parser: parse_council_paths(
+        content, "elected", parser
+    ),
+    "people": parse_council_people_rows,
+}
+
+
+def synthetic_pages(n_people_pages=200):
+    """Generate pages of each kind with the synthetic site
+
+    Returns:
+        list: list of tuples (kind of a page, content of the page)
+    """
+    site = SyntheticSite(n_regions=25, councils_per_type=n_people_pages // 100 + 1)
+    pages = []
+    for category in ("all", "elected"):
+        pages.append(("regions-" + category, site.page(site.regions_path(category))))
+        for type_id in range(len(TYPES_OF_COUNCILS)):
+            path = site.listing_path(category, 0, type_id)
+            if site.has_councils(0, type_id):
+                pages.append(("councils-" + category, site.page(path)))
+    for i in range(n_people_pages):
+        category = "all" if i % 2 else "elected"
+        region_id, type_id = i % site.n_regions, 1 + i % 2
+        path = site.council_path(
+            category, region_id, type_id, i % site.councils_per_type
+        )
+        pages.append(("people", site.page(path)))
+    # edge case: an empty page of a council
+    pages.append(("people", b""))
+    return pages
+
+
+def saved_pages(directory):
+    """Read saved pages from a directory
+
+    Returns:
+        list: list of tuples (kind of a page, content of the page)
+    """
+    pages = []
+    for path in sorted(Path(directory).glob("*.htm*")):
+        kind = next(
+            (kind for kind in PARSE_FUNCTIONS if path.name.startswith(kind)), None
+        )
+        if kind is None:
+            print("Skipping {}: unknown kind of a page".format(path.name))
+            continue
+        pages.append((kind, path.read_bytes()))
+    return pages
+
+
+def check_equivalence(pages):
+    """Check that all parsers produce identical output for every page
+
+    Raises:
+        AssertionError: outputs of parsers differ
+    """
+    for i, (kind, content) in enumerate(pages):
+        outputs = [PARSE_FUNCTIONS[kind](content, parser) for parser in PARSERS]
+        for parser, output in zip(PARSERS[1:], outputs[1:]):
+            assert output == outputs[0], "Page #{} ({}): {} differs from {}".format(
+                i, kind, parser, PARSERS[0]
+            )
+
+
+def measure_throughput(pages, parser, min_time=1.0):
+    """Measure parse throughput of a parser
+
+    Returns:
+        float: pages per second
+    """
+    n_pages = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < min_time:
+        for kind, content in pages:
+            PARSE_FUNCTIONS[kind](content, parser)
+        n_pages += len(pages)
+    return n_pages / (time.perf_counter() - start)
+
+
+def measure_pool_throughput(pages, parser, processes, min_time=1.0):
+    """Measure parse throughput of pages of councils in a pool of processes.
+    Pages are submitted by as many threads as the pool's queue can hold, as fetching threads do.
+
+    Returns:
+        float: pages per second
+    """
+    with ParsePool(max_workers=processes) as pool, ThreadPoolExecutor(
+        max_workers=pool.max_pending
+    ) as executor:
+        # start processes of the pool and check that results are the same as in-process
+        for _, content in pages:
+            col_names, data = pool.parse_council_people_rows(content, parser)
+            assert (col_names, list(map(list, data))) == parse_council_people_rows(
+                content, parser
+            )
+        n_pages = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < min_time:
+            list(
+                executor.map(
+                    lambda page: pool.parse_council_people_rows(page[1], parser), pages
+                )
+            )
+            n_pages += len(pages)
+        return n_pages / (time.perf_counter() - start)
+
+
+def main():
+    pages = synthetic_pages()
+    if len(sys.argv) > 1:
+        pages += saved_pages(sys.argv[1])
+    check_equivalence(pages)
+    print("Outputs of parsers are identical for {} pages".format(len(pages)))
+    people_pages = [page for page in pages if page[0] == "people"]
+    print("{:>8} {:>18} {:>18}".format("parser", "all, pages/s", "people, pages/s"))
+    for parser in PARSERS:
+        print(
+            "{:>8} {:>18.1f} {:>18.1f}".format(
+                parser,
+                measure_throughput(pages, parser),
+                measure_throughput(people_pages, parser),
+            )
+        )
+    n_processes = [1]
+    while n_processes[-1] * 2 <= (os.cpu_count() or 1):
+        n_processes.append(n_processes[-1] * 2)
+    print("{:>8} {:>10} {:>18}".format("parser", "processes", "people, pages/s"))
+    for parser in PARSERS:
+        for processes in n_processes:
+            print(
+                "{:>8} {:>10} {:>18.1f}".format(
+                    parser,
+                    processes,
+                    measure_pool_throughput(people_pages, parser, processes),
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
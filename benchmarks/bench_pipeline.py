@@ -0,0 +1,330 @@
+"""Offline benchmark of stages of the pipeline against the local synthetic CVK site.
+
+The synthetic site is served by a local HTTP server (see benchmarks.synthetic_server) with
+a configurable latency and size, and the scraper is pointed to it instead of the CVK site.
+Every stage (scrape, merge, aggregate, run_all, which runs all of them, and fused, which runs
+the fused pipeline of run_all --fused) is run in a separate process, which reports:
+    * wall time;
+    * time to the first result - time until the first merged rows are ready
+    (for stages other than fused, results are ready only at the end);
+    * pages/s - pages served by the server during the stage;
+    * rows/s - rows of candidates scraped (scrape, run_all) or processed (merge, aggregate);
+    * peak RSS of the process (not available on Windows).
+
+Results can be saved with --output and compared with saved results with --baseline:
+the exit code is 1 if wall time of any stage exceeds the baseline by more than --tolerance.
+
+Run from the root of the repository:
+    python -m benchmarks.bench_pipeline [--preset country] [--latency 0.05] [--workers 8] ...
+"""
+
+import json
+import multiprocessing
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import click
+import pandas as pd
+
+try:
+    import resource
+except ImportError:
+    # peak RSS is not measured on Windows
+    resource = None
+
+import CVK_scraper.scrape
+from CVK_scraper.aggregate import AGGREGATION_COLUMNS, aggregate_by_party_region_council
+from CVK_scraper.client import HttpClient
+from CVK_scraper.fetch import set_http_client
+from CVK_scraper.merge import merge_candidates_info
+from CVK_scraper.parse import PARSERS
+from CVK_scraper.parse_pool import ParsePool, set_parse_pool
+from CVK_scraper.pipeline import iter_fused_candidates_info
+from CVK_scraper.scrape import get_candidates_info
+from CVK_scraper.storage import TableWriter, read_table, write_table
+
+from .synthetic_server import SyntheticServer
+from .synthetic_site import SyntheticSite
+
+# sizes of the synthetic site: number of regions and number of councils of each type in a region
+PRESETS = {
+    "small": {"n_regions": 3, "councils_per_type": 2},
+    "medium": {"n_regions": 25, "councils_per_type": 3},
+    # about as many councils as in the whole country
+    # village and settlement councils are the majority of councils in the country
+    "country": {"n_regions": 25, "councils_per_type": 15, "village_councils": 60},
+}
+STAGES = ["scrape", "merge", "aggregate", "run_all", "fused"]
+# time when the fused pipeline yielded the first batch, set in the process of the stage
+_first_result_at = None
+
+
+def _data_paths(data_dir):
+    return {
+        "all": Path(data_dir, "all_candidates.csv"),
+        "elected": Path(data_dir, "elected_candidates.csv"),
+        "merged": Path(data_dir, "merged_candidates.csv"),
+        "aggregated": Path(data_dir, "aggregated_data.csv"),
+    }
+
+
+def _scrape(paths, workers, parser):
+    n_rows = 0
+    for category in ("all", "elected"):
+        data = get_candidates_info(category, max_workers=workers, parser=parser)
+        write_table(data, paths[category])
+        n_rows += len(data)
+    return n_rows
+
+
+def _merge(paths, workers, parser):
+    all_data = read_table(paths["all"])
+    elected_data = read_table(paths["elected"])
+    write_table(merge_candidates_info(all_data, elected_data), paths["merged"])
+    return len(all_data) + len(elected_data)
+
+
+def _aggregate(paths, workers, parser):
+    merged_data = read_table(paths["merged"], columns=AGGREGATION_COLUMNS)
+    write_table(aggregate_by_party_region_council(merged_data), paths["aggregated"])
+    return len(merged_data)
+
+
+def _run_all(paths, workers, parser):
+    n_rows = _scrape(paths, workers, parser)
+    _merge(paths, workers, parser)
+    _aggregate(paths, workers, parser)
+    return n_rows
+
+
+def _fused(paths, workers, parser):
+    global _first_result_at
+    n_rows = 0
+    aggregated_batches = []
+    with TableWriter(paths["merged"]) as writer:
+        for batch in iter_fused_candidates_info(max_workers=workers, parser=parser):
+            if _first_result_at is None:
+                _first_result_at = time.perf_counter()
+            writer.write(batch["merged"])
+            aggregated_batches.append(batch["aggregated"])
+            n_rows += len(batch["all"]) + len(batch["elected"])
+    aggregated_data = pd.concat(aggregated_batches, ignore_index=True).sort_values(
+        ["Партія", "Регіон", "Рада"], kind="stable", ignore_index=True
+    )
+    write_table(aggregated_data, paths["aggregated"])
+    return n_rows
+
+
+_STAGE_FUNCTIONS = {
+    "scrape": _scrape,
+    "merge": _merge,
+    "aggregate": _aggregate,
+    "run_all": _run_all,
+    "fused": _fused,
+}
+
+
+def _peak_rss_mb():
+    # on Linux ru_maxrss survives exec, so a spawned child would report the RSS of the parent
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak_rss / 1024**2 if sys.platform == "darwin" else peak_rss / 1024
+
+
+def _run_stage(stage, base_url, data_dir, workers, parser, parse_processes):
+    """Run a stage in a child process and measure it"""
+    CVK_scraper.scrape.CVK_BASE_URL = base_url
+    set_http_client(HttpClient(max_connections=workers))
+    pool = ParsePool(max_workers=parse_processes) if parse_processes else None
+    set_parse_pool(pool)
+    try:
+        start = time.perf_counter()
+        n_rows = _STAGE_FUNCTIONS[stage](_data_paths(data_dir), workers, parser)
+        end = time.perf_counter()
+    finally:
+        if pool is not None:
+            pool.close()
+    first_result_at = end if _first_result_at is None else _first_result_at
+    return {
+        "wall_time": end - start,
+        "first_result_time": first_result_at - start,
+        "rows": n_rows,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def _format_optional(value, format_spec):
+    return "-" if value is None else format(value, format_spec)
+
+
+@click.command()
+@click.option(
+    "--preset",
+    type=click.Choice(list(PRESETS)),
+    default="medium",
+    show_default=True,
+    help="Size of the synthetic site",
+)
+@click.option("--regions", type=int, help="Number of regions (overrides the preset)")
+@click.option(
+    "--councils-per-type",
+    type=int,
+    help="Number of councils of each type in a region (overrides the preset)",
+)
+@click.option(
+    "--village-councils",
+    type=int,
+    help="Number of village and settlement councils in a region (overrides the preset)",
+)
+@click.option("--candidates-per-council", default=60, show_default=True)
+@click.option(
+    "--biography-length",
+    default=0,
+    show_default=True,
+    help="Number of extra words in biographies (size of pages)",
+)
+@click.option(
+    "--latency", default=0.0, show_default=True, help="Delay of every response, s"
+)
+@click.option(
+    "--error-rate",
+    default=0.0,
+    show_default=True,
+    help="Share of requests answered with 503 or 429",
+)
+@click.option("--workers", default=8, show_default=True)
+@click.option("--parser", type=click.Choice(PARSERS), default="lxml", show_default=True)
+@click.option(
+    "--parse-processes",
+    default=0,
+    show_default=True,
+    help="Number of processes parsing pages of councils (0 - parse in fetching threads)",
+)
+@click.option("--output", type=click.Path(dir_okay=False), help="Save results to JSON")
+@click.option(
+    "--baseline",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Compare with results saved by --output",
+)
+@click.option(
+    "--tolerance",
+    default=0.2,
+    show_default=True,
+    help="Allowed relative slowdown compared with the baseline",
+)
+def main(
+    preset,
+    regions,
+    councils_per_type,
+    village_councils,
+    candidates_per_council,
+    biography_length,
+    latency,
+    error_rate,
+    workers,
+    parser,
+    parse_processes,
+    output,
+    baseline,
+    tolerance,
+):
+    size = dict(PRESETS[preset])
+    if regions is not None:
+        size["n_regions"] = regions
+    if councils_per_type is not None:
+        size["councils_per_type"] = councils_per_type
+    if village_councils is not None:
+        size["village_councils"] = village_councils
+    site = SyntheticSite(
+        candidates_per_council=candidates_per_council,
+        biography_length=biography_length,
+        **size
+    )
+    click.echo(
+        "{} regions, {} councils, {} pages per category, latency {} s, {} workers, {} parser, {} parse processes".format(
+            site.n_regions,
+            site.n_all_councils(),
+            site.n_pages("all"),
+            latency,
+            workers,
+            parser,
+            parse_processes,
+        )
+    )
+    click.echo(
+        "{:<10} {:>9} {:>10} {:>9} {:>10} {:>10} {:>13}".format(
+            "stage", "wall, s", "first, s", "pages", "pages/s", "rows/s", "peak RSS, MB"
+        )
+    )
+    results = {}
+    # every stage is run in a fresh process, so that peak RSS is measured per stage
+    mp_context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as data_dir, SyntheticServer(
+        site, latency=latency, error_rate=error_rate
+    ) as server:
+        for stage in STAGES:
+            n_requests = server.n_requests
+            with ProcessPoolExecutor(max_workers=1, mp_context=mp_context) as executor:
+                result = executor.submit(
+                    _run_stage,
+                    stage,
+                    server.base_url,
+                    data_dir,
+                    workers,
+                    parser,
+                    parse_processes,
+                ).result()
+            result["pages"] = server.n_requests - n_requests
+            results[stage] = result
+            pages_per_second = (
+                result["pages"] / result["wall_time"] if result["pages"] else None
+            )
+            click.echo(
+                "{:<10} {:>9.2f} {:>10.2f} {:>9} {:>10} {:>10.0f} {:>13}".format(
+                    stage,
+                    result["wall_time"],
+                    result["first_result_time"],
+                    result["pages"],
+                    _format_optional(pages_per_second, ".1f"),
+                    result["rows"] / result["wall_time"],
+                    _format_optional(result["peak_rss_mb"], ".1f"),
+                )
+            )
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if baseline:
+        with open(baseline, encoding="utf-8") as f:
+            baseline_results = json.load(f)
+        regressions = []
+        click.echo("{:<10} {:>12} {:>9}".format("stage", "baseline, s", "ratio"))
+        for stage, result in results.items():
+            if stage not in baseline_results:
+                continue
+            ratio = result["wall_time"] / baseline_results[stage]["wall_time"]
+            click.echo(
+                "{:<10} {:>12.2f} {:>8.2f}x".format(
+                    stage, baseline_results[stage]["wall_time"], ratio
+                )
+            )
+            if ratio > 1 + tolerance:
+                regressions.append(stage)
+        if regressions:
+            click.echo("Regression in stages: {}".format(", ".join(regressions)))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Benchmark of storage formats of data files.
+
+Writes a synthetic national dataset of merged candidates in every format from
+CVK_scraper.storage.STORAGE_FORMATS and measures writing, reading of all columns
+and reading of only the columns required for aggregation.
+
+Run from the root of the repository:
+    python -m benchmarks.bench_storage [NUMBER_OF_ROWS]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from CVK_scraper.aggregate import AGGREGATION_COLUMNS
+from CVK_scraper.merge import merge_candidates_info
+from CVK_scraper.storage import STORAGE_FORMATS, read_table, write_table
+
+from .bench_merge import synthetic_candidates
+
+
+def _timeit(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    merged_data = merge_candidates_info(*synthetic_candidates(n_rows))
+    # biographies are the longest column of real data
+    merged_data["Відомості"] = merged_data["Відомості"] + (
+        ", член політичної партії, Товариство з обмеженою відповідальністю, директор, "
+        "місце проживання: м. Вінниця, Вінницька обл."
+    )
+    print("{} rows".format(len(merged_data)))
+    print(
+        "{:>8} {:>10} {:>9} {:>11} {:>16}".format(
+            "format", "size, MB", "write, s", "read all, s", "read columns, s"
+        )
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        for storage_format in STORAGE_FORMATS:
+            path = Path(directory, "merged." + storage_format)
+            write_time, _ = _timeit(write_table, merged_data, path)
+            read_time, _ = _timeit(read_table, path)
+            projected_read_time, _ = _timeit(
+                read_table, path, columns=AGGREGATION_COLUMNS
+            )
+            print(
+                "{:>8} {:>10.1f} {:>9.2f} {:>11.2f} {:>16.2f}".format(
+                    storage_format,
+                    path.stat().st_size / 2**20,
+                    write_time,
+                    read_time,
+                    projected_read_time,
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
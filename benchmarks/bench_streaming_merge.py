@@ -0,0 +1,90 @@
+"""Benchmark of peak memory of merging data files of all and elected candidates.
+
+Synthetic national data is written to CSV files and merged in two ways, each in a fresh process:
+in memory (merge_candidates_info for whole data) and by partitions of councils
+(merge_candidates_files). Output files must be identical.
+
+Run from the root of the repository:
+    python -m benchmarks.bench_streaming_merge [NUMBER_OF_ROWS] [MAX_PARTITION_ROWS]
+"""
+
+import filecmp
+import multiprocessing
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from CVK_scraper.merge import merge_candidates_files, merge_candidates_info
+from CVK_scraper.storage import read_table, write_table
+
+from .bench_merge import synthetic_candidates
+from .bench_pipeline import _peak_rss_mb
+
+
+def _merge_in_memory(data_dir, max_partition_rows):
+    all_data = read_table(Path(data_dir, "all.csv"), dtype=str)
+    elected_data = read_table(Path(data_dir, "elected.csv"), dtype=str)
+    write_table(
+        merge_candidates_info(all_data, elected_data),
+        Path(data_dir, "merged_in_memory.csv"),
+    )
+
+
+def _merge_streaming(data_dir, max_partition_rows):
+    merge_candidates_files(
+        Path(data_dir, "all.csv"),
+        Path(data_dir, "elected.csv"),
+        Path(data_dir, "merged_streaming.csv"),
+        max_partition_rows=max_partition_rows,
+    )
+
+
+def _run(func, data_dir, max_partition_rows):
+    """Run a merge in a child process and measure it"""
+    start = time.perf_counter()
+    func(data_dir, max_partition_rows)
+    return time.perf_counter() - start, _peak_rss_mb()
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    max_partition_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+    mp_context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as data_dir:
+        all_data, elected_data = synthetic_candidates(n_rows)
+        write_table(all_data, Path(data_dir, "all.csv"))
+        write_table(elected_data, Path(data_dir, "elected.csv"))
+        del all_data, elected_data
+        print(
+            "Merging {} rows, partitions of up to {} rows".format(
+                n_rows, max_partition_rows
+            )
+        )
+        print("{:<10} {:>9} {:>13}".format("mode", "time, s", "peak RSS, MB"))
+        for name, func in (
+            ("in memory", _merge_in_memory),
+            ("streaming", _merge_streaming),
+        ):
+            # every merge is run in a fresh process, so that peak RSS is measured per merge
+            with ProcessPoolExecutor(max_workers=1, mp_context=mp_context) as executor:
+                wall_time, peak_rss = executor.submit(
+                    _run, func, data_dir, max_partition_rows
+                ).result()
+            print(
+                "{:<10} {:>9.2f} {:>13}".format(
+                    name,
+                    wall_time,
+                    "-" if peak_rss is None else "{:.1f}".format(peak_rss),
+                )
+            )
+        assert filecmp.cmp(
+            Path(data_dir, "merged_in_memory.csv"),
+            Path(data_dir, "merged_streaming.csv"),
+            shallow=False,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Check of scraping of several elections against local synthetic CVK sites.
+
+Every election is served by its own synthetic site, and the second election has fewer regions
+(like repeat elections, which are held only in some regions). A region of the first election only
+is scraped from both elections, so the second election has no councils. Data of both elections
+must be written and read back in both storage formats and go through extraction of info,
+merging and aggregation, where data of the second election has all columns and no rows.
+
+Run from the root of the repository:
+    python -m benchmarks.check_elections
+"""
+
+import tempfile
+from datetime import date
+from pathlib import Path
+
+import CVK_scraper.scrape
+from CVK_scraper.aggregate import aggregate_by_party_region_council
+from CVK_scraper.client import HttpClient
+from CVK_scraper.elections import register_election
+from CVK_scraper.extract import extract_info
+from CVK_scraper.fetch import set_http_client
+from CVK_scraper.merge import merge_candidates_info
+from CVK_scraper.scrape import CANDIDATES_COLUMNS, get_elections_candidates_info
+from CVK_scraper.storage import read_table, write_table
+
+from .synthetic_server import SyntheticServer
+from .synthetic_site import SyntheticSite
+
+ELECTIONS = ["check_full", "check_partial"]
+REGION = "Регіон 2 область"
+
+
+def main():
+    full_site = SyntheticSite(n_regions=3, councils_per_type=2, election_id=695)
+    partial_site = SyntheticSite(n_regions=2, councils_per_type=1, election_id=696)
+    with SyntheticServer(full_site) as full_server, SyntheticServer(
+        partial_site
+    ) as partial_server:
+        # sites of elections differ only by ports of servers
+        CVK_scraper.scrape.CVK_BASE_URL = "http://127.0.0.1:{site}/"
+        for name, server, site in (
+            (ELECTIONS[0], full_server, full_site),
+            (ELECTIONS[1], partial_server, partial_site),
+        ):
+            port = server.base_url.rstrip("/").rsplit(":", 1)[-1]
+            register_election(name, port, site.election_id, date(2020, 10, 25))
+        set_http_client(HttpClient(max_connections=4))
+        candidates_data = {
+            category: get_elections_candidates_info(
+                category, ELECTIONS, regions=[REGION], max_workers=4, parser="lxml"
+            )
+            for category in ("all", "elected")
+        }
+    for storage_format in ("csv", "parquet"):
+        with tempfile.TemporaryDirectory() as data_dir:
+            for election in ELECTIONS:
+                data = {}
+                for category in ("all", "elected"):
+                    path = Path(
+                        data_dir, "{}_{}.{}".format(election, category, storage_format)
+                    )
+                    write_table(candidates_data[category][election], path)
+                    data[category] = extract_info(read_table(path, dtype=str))
+                    assert set(CANDIDATES_COLUMNS[category]) <= set(
+                        data[category].columns
+                    )
+                merged_data = merge_candidates_info(data["all"], data["elected"])
+                aggregated_data = aggregate_by_party_region_council(merged_data)
+                path = Path(data_dir, "{}_merged.{}".format(election, storage_format))
+                write_table(merged_data, path)
+                assert read_table(path).columns.tolist() == merged_data.columns.tolist()
+                is_empty = election == ELECTIONS[1]
+                assert (len(merged_data) == 0) == is_empty
+                assert (len(aggregated_data) == 0) == is_empty
+                print(
+                    "{} ({}): {} merged rows, {} aggregated rows".format(
+                        election, storage_format, len(merged_data), len(aggregated_data)
+                    )
+                )
+    print("Data of elections without councils round-trips")
+
+
+if __name__ == "__main__":
+    main()
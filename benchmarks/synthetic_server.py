@@ -0,0 +1,186 @@
+"""Local HTTP server which serves the synthetic CVK site.
+
+Paths of pages are the same as relative to CVK_scraper.scrape.CVK_BASE_URL, so the scraper
+can be pointed to the server by replacing the base URL. Every response can be delayed
+to emulate the latency of the real site, and a share of responses can fail with 503 or 429
+to emulate an overloaded server.
+
+Run from the root of the repository to serve the site until interrupted:
+    python -m benchmarks.synthetic_server [--port PORT] [--latency SECONDS] [--regions N] ...
+"""
+
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import click
+
+from .synthetic_site import SyntheticSite
+
+
+class _SyntheticSiteHandler(BaseHTTPRequestHandler):
+    # keep-alive connections like the real site
+    protocol_version = "HTTP/1.1"
+    # headers and content are written separately, don't delay the content
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency)
+        if server.error_rate and random.random() < server.error_rate:
+            with server.stats_lock:
+                server.n_errors += 1
+            self.send_error(random.choice((429, 503)))
+            return
+        content = server.site.page(self.path.rsplit("/", 1)[-1])
+        with server.stats_lock:
+            server.n_requests += 1
+            server.n_bytes += len(content) if content is not None else 0
+        if content is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=windows-1251")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        # don't spam the output of benchmarks with access logs
+        pass
+
+
+class _SyntheticHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # many workers of the scraper may connect at once
+    request_queue_size = 128
+
+
+class SyntheticServer:
+    """Local HTTP server of the synthetic CVK site running in a background thread.
+
+    Can be used as a context manager which starts and stops the server.
+
+    Args:
+        site (SyntheticSite): synthetic site to serve
+        latency (float, optional): delay of every response in seconds. Defaults to 0.
+        host (str, optional): host of the server. Defaults to "127.0.0.1".
+        port (int, optional): port of the server. If provided 0, a free port is chosen. Defaults to 0.
+        error_rate (float, optional): share of requests answered with 503 or 429. Defaults to 0.
+    """
+
+    def __init__(self, site, latency=0.0, host="127.0.0.1", port=0, error_rate=0.0):
+        self._server = _SyntheticHTTPServer((host, port), _SyntheticSiteHandler)
+        self._server.site = site
+        self._server.latency = latency
+        self._server.error_rate = error_rate
+        self._server.n_errors = 0
+        self._server.stats_lock = threading.Lock()
+        self._server.n_requests = 0
+        self._server.n_bytes = 0
+        self._thread = None
+
+    @property
+    def base_url(self):
+        """URL to use instead of CVK_scraper.scrape.CVK_BASE_URL"""
+        host, port = self._server.server_address[:2]
+        return "http://{}:{}/".format(host, port)
+
+    @property
+    def n_requests(self):
+        """Number of requests served since the start"""
+        return self._server.n_requests
+
+    @property
+    def n_errors(self):
+        """Number of requests answered with an error since the start"""
+        return self._server.n_errors
+
+    @property
+    def n_bytes(self):
+        """Number of bytes of pages served since the start"""
+        return self._server.n_bytes
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+@click.command()
+@click.option("--host", default="127.0.0.1", show_default=True)
+@click.option("--port", default=8000, show_default=True)
+@click.option(
+    "--latency", default=0.0, show_default=True, help="Delay of every response, s"
+)
+@click.option(
+    "--error-rate",
+    default=0.0,
+    show_default=True,
+    help="Share of requests answered with 503 or 429",
+)
+@click.option("--regions", default=25, show_default=True, help="Number of regions")
+@click.option(
+    "--councils-per-type",
+    default=10,
+    show_default=True,
+    help="Number of councils of each type in a region",
+)
+@click.option(
+    "--candidates-per-council",
+    default=60,
+    show_default=True,
+    help="Number of candidates in a council",
+)
+@click.option(
+    "--biography-length",
+    default=0,
+    show_default=True,
+    help="Number of extra words in biographies (size of pages)",
+)
+def main(
+    host,
+    port,
+    latency,
+    error_rate,
+    regions,
+    councils_per_type,
+    candidates_per_council,
+    biography_length,
+):
+    site = SyntheticSite(
+        n_regions=regions,
+        councils_per_type=councils_per_type,
+        candidates_per_council=candidates_per_council,
+        biography_length=biography_length,
+    )
+    with SyntheticServer(
+        site, latency=latency, host=host, port=port, error_rate=error_rate
+    ) as server:
+        click.echo(
+            "Serving {} councils at {} (press Ctrl+C to stop)".format(
+                site.n_all_councils(), server.base_url
+            )
+        )
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
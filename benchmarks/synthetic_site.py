@@ -0,0 +1,327 @@
+"""Synthetic stand-in for the CVK site.
+
+Pages are generated deterministically on request, so a site of any size (up to a whole country)
+takes no memory. Links follow the URL scheme of the CVK site and tables have the same layout
+as the pages parsed by CVK_scraper.parse.
+"""
+
+import html
+import random
+import re
+
+from CVK_scraper.scrape import REGIONS_PATH
+
+TYPES_OF_COUNCILS = [
+    "Обласні",
+    "Міські",
+    "Районні",
+    "Районні у містах",
+    "Сільські, селищні",
+]
+_TYPE_CODES = [12, 31, 21, 41, 61]
+_LISTING_PREFIX = {"all": "pvm035", "elected": "pvm036"}
+_COUNCIL_PREFIX = {"all": "pvm056", "elected": "pvm057"}
+_COUNCIL_SUFFIX = {"Обласні": "обласна рада", "Районні": "районна рада"}
+_LISTING_RE = re.compile(
+    r"^(pvm035|pvm036)pt001f01=(\d+)pt00_t001f01=\d+pid112=(\d+)pid100=(\d+)rej=0\.html$"
+)
+_COUNCIL_RE = re.compile(
+    r"^(pvm056|pvm057)pid102=(\d+)_(\d+)_(\d+)pt001f01=(\d+)rej=0pt00_t001f01=\d+\.html$"
+)
+_PAGE_TEMPLATE = """<html>
+<head>
+<meta http-equiv="Content-Type" content="text/html; charset=windows-1251">
+<title>Місцеві вибори 2020</title>
+</head>
+<body>
+<table class="t1"><tr><td>Центральна виборча комісія</td></tr></table>
+{tables}
+</body>
+</html>
+"""
+
+
+def _cell(content, **attrs):
+    attrs_code = "".join(' {}="{}"'.format(key, value) for key, value in attrs.items())
+    return "<td{}>{}</td>".format(attrs_code, content)
+
+
+def _link(text, path):
+    return '<a href="{}">{}</a>'.format(path, html.escape(text, quote=False))
+
+
+def _table(rows, css_class="t2"):
+    return '<table class="{}">\n{}\n</table>'.format(
+        css_class, "\n".join("<tr>{}</tr>".format("".join(row)) for row in rows)
+    )
+
+
+class SyntheticSite:
+    """Deterministic synthetic CVK site.
+
+    Args:
+        n_regions (int, optional): number of regions. Defaults to 25.
+        councils_per_type (int, optional): number of councils of each type in a region
+        (regional councils are always single). Defaults to 10.
+        village_councils (int, optional): number of village and settlement councils in a region.
+        If provided None, councils_per_type is used. Defaults to None.
+        candidates_per_council (int, optional): number of candidates in a council. Defaults to 60.
+        biography_length (int, optional): number of extra words in a biography of a candidate,
+        controls the size of pages. Defaults to 0.
+        seed (int, optional): seed of generated data. Defaults to 0.
+        election_id (int, optional): id of the election in links. Defaults to 695 (local elections of 2020).
+    """
+
+    def __init__(
+        self,
+        n_regions=25,
+        councils_per_type=10,
+        village_councils=None,
+        candidates_per_council=60,
+        biography_length=0,
+        seed=0,
+        election_id=695,
+    ):
+        self.n_regions = n_regions
+        self.councils_per_type = councils_per_type
+        self.village_councils = (
+            councils_per_type if village_councils is None else village_councils
+        )
+        self.candidates_per_council = candidates_per_council
+        self.biography_length = biography_length
+        self.seed = seed
+        self.election_id = election_id
+
+    def region_name(self, region_id):
+        return "Регіон {} область".format(region_id)
+
+    def has_councils(self, region_id, type_id):
+        # councils of districts in cities exist only in some regions
+        return type_id != 3 or region_id % 3 == 0
+
+    def n_councils(self, region_id, type_id):
+        if not self.has_councils(region_id, type_id):
+            return 0
+        if type_id == 4:
+            return self.village_councils
+        return 1 if type_id == 0 else self.councils_per_type
+
+    def council_name(self, region_id, type_id, council_id):
+        suffix = _COUNCIL_SUFFIX.get(TYPES_OF_COUNCILS[type_id], "міська рада")
+        if type_id == 4:
+            # names of village and settlement councils repeat across regions
+            suffix = "сільська рада" if council_id % 2 else "селищна рада"
+            return "Громада {}-{} {}".format(type_id, council_id, suffix)
+        return "Громада {}-{}-{} {}".format(region_id, type_id, council_id, suffix)
+
+    def district_name(self, council_id):
+        return "Район {} район".format(council_id % 3)
+
+    def regions_path(self, category):
+        return REGIONS_PATH[category].format(id=self.election_id)
+
+    def listing_path(self, category, region_id, type_id):
+        return "{0}pt001f01={1}pt00_t001f01={1}pid112={2}pid100={3}rej=0.html".format(
+            _LISTING_PREFIX[category], self.election_id, _TYPE_CODES[type_id], region_id
+        )
+
+    def council_path(self, category, region_id, type_id, council_id):
+        return "{0}pid102={1}_{2}_{3}pt001f01={4}rej=0pt00_t001f01={4}.html".format(
+            _COUNCIL_PREFIX[category], region_id, type_id, council_id, self.election_id
+        )
+
+    def n_pages(self, category):
+        """Number of pages of a category which are fetched in a full scrape"""
+        n_listings = sum(
+            self.has_councils(region_id, type_id)
+            for region_id in range(self.n_regions)
+            for type_id in range(len(TYPES_OF_COUNCILS))
+        )
+        return 1 + n_listings + self.n_all_councils()
+
+    def n_all_councils(self):
+        return sum(
+            self.n_councils(region_id, type_id)
+            for region_id in range(self.n_regions)
+            for type_id in range(len(TYPES_OF_COUNCILS))
+        )
+
+    def page(self, path):
+        """Get content of a page
+
+        Args:
+            path (str): link path of a page (relative to the base URL)
+
+        Returns:
+            bytes: content of the page or None if the page doesn't exist
+        """
+        for category in REGIONS_PATH:
+            if path == self.regions_path(category):
+                return self._render(self._regions_table(category))
+        match = _LISTING_RE.match(path)
+        if match and int(match.group(2)) == self.election_id:
+            prefix, _, type_code, region_id = match.groups()
+            category = "all" if prefix == _LISTING_PREFIX["all"] else "elected"
+            type_id = _TYPE_CODES.index(int(type_code))
+            return self._render(self._listing_table(category, int(region_id), type_id))
+        match = _COUNCIL_RE.match(path)
+        if match and int(match.group(5)) == self.election_id:
+            prefix, region_id, type_id, council_id, _ = match.groups()
+            category = "all" if prefix == _COUNCIL_PREFIX["all"] else "elected"
+            return self._render(
+                self._people_tables(
+                    category, int(region_id), int(type_id), int(council_id)
+                )
+            )
+        return None
+
+    @staticmethod
+    def _render(tables):
+        return _PAGE_TEMPLATE.format(tables="\n".join(tables)).encode("windows-1251")
+
+    def _regions_table(self, category):
+        info = _table([[_cell("Місцеві вибори 25 жовтня 2020 року")]])
+        if category == "all":
+            header = [_cell("Регіон", rowspan=2)] + [
+                _cell(type_of_council, colspan=2)
+                for type_of_council in TYPES_OF_COUNCILS
+            ]
+            header[2] = _cell("Міські (міста обласного значення)", colspan=2)
+            subheader = [_cell("Кількість"), _cell("Кандидатів")] * len(
+                TYPES_OF_COUNCILS
+            )
+        else:
+            header = [_cell("Регіон", rowspan=2)] + [
+                _cell(type_of_council + " ради", colspan=2)
+                for type_of_council in TYPES_OF_COUNCILS
+            ]
+            subheader = [_cell("Обраних"), _cell("Рад")] * len(TYPES_OF_COUNCILS)
+        header.append(_cell("Всього", colspan=2))
+        subheader += [_cell("Кількість"), _cell("Кандидатів")]
+        rows = [header, subheader]
+        for region_id in range(self.n_regions):
+            row = [_cell(self.region_name(region_id))]
+            # in the elected section links are preceded by the number of elected
+            if category == "elected":
+                row.append(_cell(str(self.n_regions)))
+            for type_id in range(len(TYPES_OF_COUNCILS)):
+                n_councils = self.n_councils(region_id, type_id)
+                if n_councils:
+                    path = self.listing_path(category, region_id, type_id)
+                    row.append(_cell(_link(str(n_councils), path)))
+                else:
+                    row.append(_cell("&nbsp;"))
+                row.append(_cell(str(n_councils * self.candidates_per_council)))
+            row += [_cell(_link("всього", self.regions_path(category))), _cell("")]
+            rows.append(row)
+        rows.append([_cell("Всього")] + [_cell("")] * (len(rows[2]) - 1))
+        return [info, _table(rows)]
+
+    def _listing_table(self, category, region_id, type_id):
+        rows = [[_cell("Назва ради"), _cell("Кількість")]]
+        for council_id in range(self.n_councils(region_id, type_id)):
+            name = self.council_name(region_id, type_id, council_id)
+            if category == "elected":
+                # names of village and settlement councils in the elected section include a district
+                if type_id == 4:
+                    name = "{}, {}".format(self.district_name(council_id), name)
+                name = "{}, {}".format(self.region_name(region_id), name)
+            path = self.council_path(category, region_id, type_id, council_id)
+            rows.append(
+                [_cell(_link(name, path)), _cell(str(self.candidates_per_council))]
+            )
+        return [_table(rows)]
+
+    def _candidates(self, region_id, type_id, council_id):
+        """Generate candidates of a council: party, number, name, biography, votes, quota and elected flag"""
+        rng = random.Random(
+            "{}-{}-{}-{}".format(self.seed, region_id, type_id, council_id)
+        )
+        candidates = []
+        n_parties = rng.randint(3, 8)
+        for i in range(self.candidates_per_council):
+            party = 'Політична партія "Партія {}"'.format(i % n_parties)
+            number = i // n_parties
+            gender = rng.random() < 0.5
+            name = "Прізвище{} Ім'я{} По-батькові{}".format(
+                rng.randint(1, 10**6), rng.randint(1, 300), rng.randint(1, 300)
+            )
+            biography = (
+                "{}, {} {:02d}.{:02d}.{} р., освіта {}, {}, "
+                'ТОВ "Підприємство {}", директор, місце проживання: м. Місто {}, '
+                "{} обл.".format(
+                    "Громадянка України" if gender else "Громадянин України",
+                    "народилася" if gender else "народився",
+                    rng.randint(1, 28),
+                    rng.randint(1, 12),
+                    rng.randint(1940, 2000),
+                    rng.choice(
+                        ["вища", "професійно-технічна", "повна загальна середня"]
+                    ),
+                    "член {}".format(party) if rng.random() < 0.5 else "безпартійний",
+                    rng.randint(1, 1000),
+                    rng.randint(1, 1000),
+                    self.region_name(region_id).split()[1],
+                )
+            )
+            biography += " слово" * self.biography_length
+            votes = rng.randint(0, 3000)
+            quota = "{:.2f}".format(rng.random() * 150).replace(".", ",")
+            elected = number < 2
+            candidates.append((party, number, name, biography, votes, quota, elected))
+        return candidates
+
+    def _people_tables(self, category, region_id, type_id, council_id):
+        info = _table(
+            [
+                [
+                    _cell(
+                        "<b>{}</b>".format(
+                            self.council_name(region_id, type_id, council_id)
+                        )
+                    )
+                ]
+            ]
+        )
+        candidates = self._candidates(region_id, type_id, council_id)
+        if category == "all":
+            header = [
+                "№ ОВО",
+                "Прізвище, ім'я, по батькові",
+                "Відомості",
+                "Голосів ЗА",
+                "% від квоти",
+            ]
+        else:
+            header = [
+                "№ ТВО, за яким закріплено",
+                "Прізвище, ім'я, по батькові",
+                "Відомості про обраного депутата",
+                "Голосів ЗА",
+                "% від квоти",
+                "Виборчий округ, в якому обрано",
+            ]
+            candidates = [candidate for candidate in candidates if candidate[-1]]
+        rows = [[_cell(col_name) for col_name in header]]
+        for party in sorted({candidate[0] for candidate in candidates}):
+            rows.append(
+                [_cell("<b>{}</b>".format(html.escape(party)), colspan=len(header))]
+            )
+            for candidate_party, number, name, biography, votes, quota, _ in candidates:
+                if candidate_party != party:
+                    continue
+                row = [
+                    _cell("Перший кандидат" if number == 0 else str(number)),
+                    _cell(html.escape(name)),
+                    _cell(
+                        "\n{},<br><span>{}</span>\n".format(
+                            *[html.escape(part) for part in biography.split(", ", 1)]
+                        )
+                    ),
+                    _cell(str(votes)),
+                    _cell(quota),
+                ]
+                if category == "elected":
+                    row.append(_cell("ЄБВО" if number == 0 else str(number % 8 + 1)))
+                rows.append(row)
+        return [info, _table(rows)]
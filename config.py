@@ -1,26 +1,75 @@
+from datetime import date
 from pathlib import Path
 
 # директорія для збереження даних
 DATA_DIR = "data"
-# назва файлу даних про висунутих кандидатів
-ALL_CANDIDATES_RAW_FILE_CSV = "01_01_all_candidates.csv"
-# назва файлу даних про обраних кандидатів
-ELECTED_CANDIDATES_RAW_FILE_CSV = "01_02_elected_candidates.csv"
-# назва файлу зведених даних про обраних та висунутих кандидатів
-MERGED_FILE_CSV = "02_01_merged_candidates.csv"
-# назва файлу даних про висунутих і обраних кандидатів по партіям, регіонам та радам
-AGGREGATED_FILE_CSV = "03_01_aggregated_data.csv"
+# Формат файлів даних. Можливі опції:
+# "csv" - текстові файли, "parquet" - колонковий формат (швидше читання і запис, менший розмір)
+STORAGE_FORMAT = "csv"
+# назва файлу даних про висунутих кандидатів (без розширення)
+ALL_CANDIDATES_RAW_FILE = "01_01_all_candidates"
+# назва файлу даних про обраних кандидатів (без розширення)
+ELECTED_CANDIDATES_RAW_FILE = "01_02_elected_candidates"
+# назва файлу зведених даних про обраних та висунутих кандидатів (без розширення)
+MERGED_FILE = "02_01_merged_candidates"
+# назва файлу даних про висунутих і обраних кандидатів по партіям, регіонам та радам (без розширення)
+AGGREGATED_FILE = "03_01_aggregated_data"
 
-CANDIDATES_RAW_FILE_CSV_PATH = {
-    "all": Path(DATA_DIR, ALL_CANDIDATES_RAW_FILE_CSV),
-    "elected": Path(DATA_DIR, ELECTED_CANDIDATES_RAW_FILE_CSV),
+CANDIDATES_RAW_FILE_PATH = {
+    "all": Path(DATA_DIR, ALL_CANDIDATES_RAW_FILE + "." + STORAGE_FORMAT),
+    "elected": Path(DATA_DIR, ELECTED_CANDIDATES_RAW_FILE + "." + STORAGE_FORMAT),
 }
-MERGED_FILE_CSV_PATH = Path(DATA_DIR, MERGED_FILE_CSV)
-AGGREGATED_FILE_CSV_PATH = Path(DATA_DIR, AGGREGATED_FILE_CSV)
+MERGED_FILE_PATH = Path(DATA_DIR, MERGED_FILE + "." + STORAGE_FORMAT)
+AGGREGATED_FILE_PATH = Path(DATA_DIR, AGGREGATED_FILE + "." + STORAGE_FORMAT)
+# файл з хешами сторінок рад для інкрементального оновлення даних
+PAGE_HASHES_PATH = Path(DATA_DIR, "page_hashes.json")
+# Максимальна кількість рядків частини даних, яка зводиться за раз (команда merge --streaming).
+# Дані однієї ради ніколи не розділяються між частинами
+MERGE_PARTITION_ROWS = 200_000
+# база даних SQLite зі зведеними та агрегованими даними для швидких запитів (команди load-db та query)
+DATABASE_PATH = Path(DATA_DIR, "candidates.sqlite")
+# директорія для проміжних даних стягування (для продовження перерваного стягування)
+CHECKPOINT_DIR = Path(DATA_DIR, "checkpoint")
+# файл звіту з метриками запуску (опція --profile)
+PROFILE_PATH = Path(DATA_DIR, "profile.json")
+
+# Додаткові вибори (повторні, проміжні), які можна стягнути опцією --elections, крім виборів 2020 року ("vm2020").
+# Формат: {"назва": ("директорія сайту ЦВК", id виборів з посилань сайту, date(рік, місяць, день))}
+# Дані кожних виборів записуються в окрему піддиректорію директорії даних
+EXTRA_ELECTIONS = {}
 
 # Регіони для опрацювання.
 # Якщо поставити значення None, то будуть опрацьовані всі можливі регіони
 REGIONS = ["Вінницька область", "Волинська область", "Дніпропетровська область"]
 # Типи рад для опрацювання.
-# Можливі опції: "Обласні", "Міські", "Районні", "Районні у містах"
-TYPES_OF_COUNCILS = ["Міські"]
\ No newline at end of file
+# Можливі опції: "Обласні", "Міські", "Районні", "Районні у містах", "Сільські, селищні"
+TYPES_OF_COUNCILS = ["Міські"]
+# Кількість сторінок, які завантажуються одночасно
+MAX_WORKERS = 8
+# Час очікування (у секундах) з'єднання з сервером і відповіді сервера
+REQUEST_TIMEOUT = (10, 60)
+# Кількість повторних спроб запиту після помилки з'єднання або відповіді 429 чи 5xx
+MAX_RETRIES = 5
+# Час відповіді сервера (у секундах), до якого кількість одночасних запитів поступово зростає (до значення опції --workers).
+# Після помилок і відповідей 429 кількість одночасних запитів зменшується вдвічі.
+# Якщо поставити значення None, то час відповіді не впливає на кількість запитів
+TARGET_LATENCY = 2.0
+# Кількість процесів для парсингу сторінок рад.
+# Якщо поставити значення 0, то сторінки парсяться в потоках завантаження (в одному процесі)
+PARSE_PROCESSES = 0
+# Витягувати з відомостей про кандидатів дату народження, вік, освіту, членство в партії та місце проживання в окремі колонки
+EXTRACT_INFO = True
+# Видаляти текст відомостей про кандидатів після витягування колонок (менший розмір файлів даних)
+DROP_INFO = False
+# Парсер сторінок. Можливі опції:
+# "bs4" - повне дерево сторінки BeautifulSoup, "lxml" - швидкий пошук таблиць через lxml
+HTML_PARSER = "lxml"
+
+# директорія для кешу завантажених сторінок
+CACHE_DIR = "cache"
+# Час (у секундах), після якого сторінка з кешу перевіряється на сервері.
+# Якщо поставити значення None, то сторінки з кешу не будуть перевірятися
+CACHE_TTL = 24 * 60 * 60
+# Максимальний розмір кешу в байтах.
+# Якщо поставити значення None, то розмір кешу не буде обмежено
+CACHE_MAX_SIZE = 2 * 1024**3
@@ -1,141 +1,849 @@
 from CVK_scraper import *
 from config import *
 
+import json
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
 import click
 
+# register elections from the config
+for name, (site, election_id, election_date) in EXTRA_ELECTIONS.items():
+    register_election(name, site, election_id, election_date)
+
 
 @click.group(help="Local election data scraper")
 def cli():
     pass
 
 
+@contextmanager
+def profiling(profile, command):
+    """Measure time of a command. If profiling is enabled, metrics of the run are collected,
+    a progress line is shown and a report is written to PROFILE_PATH at the end.
+
+    Args:
+        profile (bool): will collect metrics of the run
+        command (str): name of the command
+    """
+    # metrics are disabled or already collected by an outer command (e.g. run_all)
+    if not profile or get_metrics() is not None:
+        with timer(command):
+            yield
+        return
+    metrics = RunMetrics(progress=True)
+    set_metrics(metrics)
+    try:
+        with timer(command):
+            yield
+    finally:
+        set_metrics(None)
+        metrics.dump(PROFILE_PATH)
+
+
+def set_up_http_client(workers):
+    """Set up the HTTP client shared by all requests
+
+    Args:
+        workers (int): maximal number of concurrent requests
+    """
+    set_http_client(
+        HttpClient(
+            max_connections=workers,
+            timeout=REQUEST_TIMEOUT,
+            max_retries=MAX_RETRIES,
+            target_latency=TARGET_LATENCY,
+        )
+    )
+
+
+@contextmanager
+def parsing_pool(processes):
+    """Parse pages of councils in a pool of processes while the block is running
+
+    Args:
+        processes (int): number of processes. If 0, pages are parsed in fetching threads.
+    """
+    if not processes:
+        yield
+        return
+    with ParsePool(max_workers=processes) as pool:
+        set_parse_pool(pool)
+        try:
+            yield
+        finally:
+            set_parse_pool(None)
+
+
+def set_up_page_cache(no_cache, offline):
+    """Set up the page cache
+
+    Args:
+        no_cache (bool): will not use the page cache
+        offline (bool): will serve pages only from the page cache
+    """
+    if no_cache:
+        set_page_cache(None)
+    else:
+        set_page_cache(
+            PageCache(
+                CACHE_DIR, ttl=CACHE_TTL, max_size=CACHE_MAX_SIZE, offline=offline
+            )
+        )
+
+
+def read_stored_table(path):
+    """Read a stored data file with types of the schema, so patched files are written
+    the same way as after a full run (types of columns aren't guessed by pandas)
+
+    Args:
+        path (Path): path of a data file
+
+    Returns:
+        DataFrame: data from the file or an empty DataFrame if the file doesn't exist
+    """
+    if not path.exists():
+        return pd.DataFrame()
+    return apply_schema(read_table(path, dtype=str))
+
+
+def election_data_paths(election=None):
+    """Get paths of data files of an election.
+    Data of elections provided with the --elections option are written to subdirectories
+    of DATA_DIR named after elections, otherwise data files are in DATA_DIR.
+
+    Args:
+        election (str, optional): name of an election. Defaults to None.
+
+    Returns:
+        dict: paths of data files: "all", "elected", "merged" and "aggregated"
+    """
+    paths = {
+        "all": CANDIDATES_RAW_FILE_PATH["all"],
+        "elected": CANDIDATES_RAW_FILE_PATH["elected"],
+        "merged": MERGED_FILE_PATH,
+        "aggregated": AGGREGATED_FILE_PATH,
+    }
+    if election is None:
+        return paths
+    return {name: Path(DATA_DIR, election, path.name) for name, path in paths.items()}
+
+
+def parse_elections(ctx, param, value):
+    """Parse a comma-separated list of names of elections"""
+    if not value:
+        return ()
+    elections = []
+    for election in value.split(","):
+        election = election.strip()
+        if election not in ELECTIONS:
+            raise click.BadParameter(
+                "unknown election {}, possible options: {}".format(
+                    election, ", ".join(ELECTIONS)
+                )
+            )
+        if election not in elections:
+            elections.append(election)
+    return tuple(elections)
+
+
+elections_option = click.option(
+    "--elections",
+    callback=parse_elections,
+    help="Comma-separated names of elections, data of every election are in a subdirectory of the data directory",
+)
+
+
 @cli.command(help="Scrape data about candidates")
 @click.option("--verbose", is_flag=True, help="Will print process messages")
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Will show progress and write a report with metrics of the run",
+)
+@click.option(
+    "--workers",
+    default=MAX_WORKERS,
+    show_default=True,
+    help="Number of pages fetched concurrently",
+)
+@click.option(
+    "--parser",
+    type=click.Choice(PARSERS),
+    default=HTML_PARSER,
+    show_default=True,
+    help="Parser of pages",
+)
+@click.option(
+    "--parse-processes",
+    default=PARSE_PROCESSES,
+    show_default=True,
+    help="Number of processes parsing pages of councils (0 - parse in fetching threads)",
+)
+@click.option(
+    "--extract-info/--no-extract-info",
+    "extract",
+    default=EXTRACT_INFO,
+    show_default=True,
+    help="Will extract date of birth, age, education, party membership and residence from info about candidates",
+)
+@click.option(
+    "--drop-info/--keep-info",
+    default=DROP_INFO,
+    show_default=True,
+    help="Will drop info about candidates after extraction",
+)
+@click.option("--no-cache", is_flag=True, help="Will not use the page cache")
+@click.option(
+    "--offline", is_flag=True, help="Will serve pages only from the page cache"
+)
+@click.option("--resume", is_flag=True, help="Will resume an interrupted scrape")
+@elections_option
 @click.argument(
     "categories",
     nargs=-1,
 )
-def scrape(verbose, categories):
+def scrape(
+    verbose,
+    profile,
+    workers,
+    parser,
+    parse_processes,
+    extract,
+    drop_info,
+    no_cache,
+    offline,
+    resume,
+    elections,
+    categories,
+):
     """Scrape data about candidates
 
     Args:
         verbose (bool): will print process messages
+        profile (bool): will show progress and write a report with metrics of the run
+        workers (int): number of pages fetched concurrently
+        parser (str): parser of pages
+        parse_processes (int): number of processes parsing pages of councils (0 - parse in fetching threads)
+        extract (bool): will extract date of birth, age, education, party membership and residence
+        from info about candidates
+        drop_info (bool): will drop info about candidates after extraction
+        no_cache (bool): will not use the page cache
+        offline (bool): will serve pages only from the page cache
+        resume (bool): will resume an interrupted scrape
+        elections (tuple): names of elections crawled in a single job, data of every election
+        are written to its subdirectory of DATA_DIR. If empty, DEFAULT_ELECTION is scraped into DATA_DIR.
         categories (list): Сategories of candidates to scrape. Possible options: "all", "elected".
 
     Returns:
-        dict: dict of DataFrames with scraped data. Key is category of candidates
+        dict: dict of DataFrames with scraped data. Key is category of candidates.
+        With elections, dict of such dicts where Key is a name of an election.
     """
-    # define an ad-hoc print function for verbose option
-    verboseprint = print if verbose else lambda *a, **k: None
-    # define all possible categories
-    all_categories = ("all", "elected")
-    # init return dictionary
-    candidates_data = {}
-    # if no categories are provided or they provided incorrectly, scrape data for all categories
-    if len(categories) == 0 or (
-        "all" not in categories and "elected" not in categories
-    ):
-        categories = all_categories
-    for category in categories:
-        if category in all_categories:
-            verboseprint("Scraping data about {} candidates".format(category))
-            candidates_data[category] = get_candidates_info(
-                category=category,
-                regions=REGIONS,
-                types_of_councils=TYPES_OF_COUNCILS,
+    with profiling(profile, "scrape"), parsing_pool(parse_processes):
+        # define an ad-hoc print function for verbose option
+        verboseprint = print if verbose else lambda *a, **k: None
+        set_up_http_client(workers)
+        set_up_page_cache(no_cache, offline)
+        # set up the checkpoint, so an interrupted scrape can be resumed
+        checkpoint = ShardStore(CHECKPOINT_DIR)
+        if resume:
+            verboseprint(
+                "Resuming the scrape: {} councils are already scraped".format(
+                    len(checkpoint)
+                )
             )
-            verboseprint("Data successfully scraped! Writing data...")
-            # write DataFrame to CSV file
-            candidates_data[category].to_csv(
-                CANDIDATES_RAW_FILE_CSV_PATH[category], index=False
-            )
-            verboseprint("Data successfully written.")
-    return candidates_data
+        else:
+            checkpoint.clear()
+        # define all possible categories
+        all_categories = ("all", "elected")
+        # init return dictionary
+        candidates_data = {}
+        # if no categories are provided or they provided incorrectly, scrape data for all categories
+        if len(categories) == 0 or (
+            "all" not in categories and "elected" not in categories
+        ):
+            categories = all_categories
+        for category in categories:
+            if category in all_categories:
+                verboseprint("Scraping data about {} candidates".format(category))
+                # all elections are crawled at once with shared workers
+                scraped_data = get_elections_candidates_info(
+                    category=category,
+                    elections=elections or (DEFAULT_ELECTION,),
+                    regions=REGIONS,
+                    types_of_councils=TYPES_OF_COUNCILS,
+                    max_workers=workers,
+                    parser=parser,
+                    checkpoint=checkpoint,
+                )
+                verboseprint("Data successfully scraped! Writing data...")
+                for election, data in scraped_data.items():
+                    if extract:
+                        verboseprint("Extracting columns from info about candidates...")
+                        data = extract_info(
+                            data,
+                            drop_info=drop_info,
+                            reference_date=get_election(election)["date"],
+                        )
+                    # without elections, data are written to DATA_DIR
+                    partition = election if elections else None
+                    candidates_data.setdefault(partition, {})[category] = data
+                    path = election_data_paths(partition)[category]
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    # write DataFrame to file
+                    write_table(data, path)
+                verboseprint("Data successfully written.")
+        # the scrape is completed, the checkpoint is no longer needed
+        checkpoint.clear()
+        return candidates_data if elections else candidates_data.get(None, {})
 
 
 @cli.command(help="Merge data of all and elected candidates")
 @click.option("--verbose", is_flag=True, help="Will print process messages")
-def merge(verbose, candidates_data=None):
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Will show progress and write a report with metrics of the run",
+)
+@click.option(
+    "--streaming",
+    is_flag=True,
+    help="Will merge data from files by partitions of councils with bounded memory",
+)
+@elections_option
+def merge(verbose, profile, streaming, elections, candidates_data=None):
     """Merge data of all and elected candidates
 
     Args:
         verbose (bool): will print process messages
-        candidates_data (dict, optional): dict of DataFrames with scraped data where Key is category of candidates.
-        Defaults to None.
+        profile (bool): will show progress and write a report with metrics of the run
+        streaming (bool): will merge data from files by partitions of councils with bounded memory
+        elections (tuple): names of elections whose data are merged separately. If empty, data in DATA_DIR are merged.
+        candidates_data (dict, optional): dict of DataFrames with scraped data where Key is category of candidates
+        (with elections, dict of such dicts where Key is a name of an election). Defaults to None.
 
     Returns:
-        DataFrame: merged data of all and elected candidates
+        DataFrame: merged data of all and elected candidates (None in the streaming mode).
+        With elections, dict of merged data where Key is a name of an election.
     """
-    # define an ad-hoc print function for verbose option
-    verboseprint = print if verbose else lambda *a, **k: None
-    # if DataFrame isn't provided, read data from files
-    if candidates_data is None:
-        verboseprint("Reading data from files...")
-        candidates_data = {}
-        candidates_data["all"] = pd.read_csv(
-            CANDIDATES_RAW_FILE_CSV_PATH["all"], low_memory=False
-        )
-        candidates_data["elected"] = pd.read_csv(
-            CANDIDATES_RAW_FILE_CSV_PATH["elected"], low_memory=False
-        )
-    verboseprint("Merging data...")
-    # merge candidates data
-    merged_candidates_data = merge_candidates_info(
-        candidates_data["all"], candidates_data["elected"]
-    )
-    verboseprint("Data succesfully merged! Writing merged data...")
-    # write DataFrame to CSV file
-    merged_candidates_data.to_csv(MERGED_FILE_CSV_PATH, index=False)
-    verboseprint("Data successfully written.")
-    return merged_candidates_data
+    with profiling(profile, "merge"):
+        # define an ad-hoc print function for verbose option
+        verboseprint = print if verbose else lambda *a, **k: None
+        if candidates_data is not None and not elections:
+            candidates_data = {None: candidates_data}
+        merged_data = {}
+        # data of every election are merged separately
+        for election in elections or (None,):
+            if election is not None:
+                verboseprint("Election {}".format(election))
+            paths = election_data_paths(election)
+            if streaming and candidates_data is None:
+                verboseprint("Merging data from files by partitions...")
+                merge_candidates_files(
+                    paths["all"],
+                    paths["elected"],
+                    paths["merged"],
+                    max_partition_rows=MERGE_PARTITION_ROWS,
+                )
+                verboseprint("Data succesfully merged and written.")
+                merged_data[election] = None
+                continue
+            # if DataFrame isn't provided, read data from files
+            if candidates_data is None:
+                verboseprint("Reading data from files...")
+                # types of columns are assigned by the schema, other columns are kept as scraped
+                election_data = {
+                    category: read_table(paths[category], dtype=str)
+                    for category in ("all", "elected")
+                }
+            else:
+                election_data = candidates_data[election]
+            verboseprint("Merging data...")
+            # merge candidates data
+            merged_data[election] = merge_candidates_info(
+                election_data["all"], election_data["elected"]
+            )
+            verboseprint("Data succesfully merged! Writing merged data...")
+            # write DataFrame to file
+            write_table(merged_data[election], paths["merged"])
+            verboseprint("Data successfully written.")
+        return merged_data if elections else merged_data[None]
 
 
 @cli.command(help="Aggregate data about candidates")
 @click.option("--verbose", is_flag=True, help="Will print process messages")
-def aggregate(verbose, merged_candidates_data=None):
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Will show progress and write a report with metrics of the run",
+)
+@elections_option
+def aggregate(verbose, profile, elections, merged_candidates_data=None):
     """Aggregate candidates info data by party, region and council
 
     Args:
         verbose (bool): will print process messages
-        merged_candidates_data (DataFrame, optional): merged data of all and elected candidates.
-        Defaults to None.
+        profile (bool): will show progress and write a report with metrics of the run
+        elections (tuple): names of elections whose data are aggregated separately.
+        If empty, data in DATA_DIR are aggregated.
+        merged_candidates_data (DataFrame, optional): merged data of all and elected candidates
+        (with elections, dict of merged data where Key is a name of an election). Defaults to None.
 
     Returns:
-        DataFrame: aggregated data
+        DataFrame: aggregated data. With elections, dict of aggregated data where Key is a name of an election.
+    """
+    with profiling(profile, "aggregate"):
+        # define an ad-hoc print function for verbose option
+        verboseprint = print if verbose else lambda *a, **k: None
+        if merged_candidates_data is not None and not elections:
+            merged_candidates_data = {None: merged_candidates_data}
+        aggregated_data = {}
+        # data of every election are aggregated separately
+        for election in elections or (None,):
+            if election is not None:
+                verboseprint("Election {}".format(election))
+            paths = election_data_paths(election)
+            # if DataFrame isn't provided, read data from files
+            if merged_candidates_data is None:
+                verboseprint("Reading data from files...")
+                # read only columns required for aggregation
+                merged_data = read_table(paths["merged"], columns=AGGREGATION_COLUMNS)
+            else:
+                merged_data = merged_candidates_data[election]
+            # aggregate data
+            verboseprint("Data aggregating")
+            aggregated_data[election] = aggregate_by_party_region_council(merged_data)
+            verboseprint("Writing aggregated data...")
+            # write DataFrame to file
+            write_table(aggregated_data[election], paths["aggregated"])
+            verboseprint("Data successfully written.")
+        return aggregated_data if elections else aggregated_data[None]
+
+
+@cli.command(help="Load merged and aggregated data into the SQLite database")
+@click.option("--verbose", is_flag=True, help="Will print process messages")
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Will show progress and write a report with metrics of the run",
+)
+def load_db(verbose, profile):
+    """Load merged and aggregated data into the SQLite database
+
+    Args:
+        verbose (bool): will print process messages
+        profile (bool): will show progress and write a report with metrics of the run
+    """
+    with profiling(profile, "load_db"):
+        # define an ad-hoc print function for verbose option
+        verboseprint = print if verbose else lambda *a, **k: None
+        verboseprint("Loading data into the database...")
+        n_rows = load_database(DATABASE_PATH, MERGED_FILE_PATH, AGGREGATED_FILE_PATH)
+        verboseprint(
+            "Data successfully loaded: {}".format(
+                ", ".join("{} {}".format(n, table) for table, n in n_rows.items())
+            )
+        )
+
+
+@cli.command(help="Query candidates or aggregated data from the SQLite database")
+@click.option("--verbose", is_flag=True, help="Will print process messages")
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Will show progress and write a report with metrics of the run",
+)
+@click.option("--region", help="Name of a region")
+@click.option("--council", help="Name of a council")
+@click.option("--party", help="Name of a party")
+@click.option("--name", help="Full name of a candidate or its beginning")
+@click.option(
+    "--status",
+    type=click.Choice(["обрано", "не обрано"]),
+    help="Status of candidates",
+)
+@click.option(
+    "--aggregated",
+    is_flag=True,
+    help="Will query aggregated data instead of candidates",
+)
+@click.option(
+    "--limit",
+    default=100,
+    show_default=True,
+    help="Maximal number of rows (0 - all rows)",
+)
+def query(verbose, profile, region, council, party, name, status, aggregated, limit):
+    """Query candidates or aggregated data from the SQLite database
+
+    Args:
+        verbose (bool): will print process messages
+        profile (bool): will show progress and write a report with metrics of the run
+        region (str): name of a region
+        council (str): name of a council
+        party (str): name of a party
+        name (str): full name of a candidate or its beginning
+        status (str): status of candidates
+        aggregated (bool): will query aggregated data instead of candidates
+        limit (int): maximal number of rows (0 - all rows)
+
+    Returns:
+        DataFrame: rows matching the query
+    """
+    with profiling(profile, "query"):
+        # define an ad-hoc print function for verbose option
+        verboseprint = print if verbose else lambda *a, **k: None
+        if aggregated and (name is not None or status is not None):
+            raise click.UsageError(
+                "--name and --status can't be used with --aggregated"
+            )
+        if not DATABASE_PATH.exists():
+            raise click.ClickException(
+                "The database doesn't exist, create it with the load-db command"
+            )
+        start = time.perf_counter()
+        if aggregated:
+            data = query_aggregated(
+                DATABASE_PATH, region, council, party, limit=limit or None
+            )
+        else:
+            data = query_candidates(
+                DATABASE_PATH, region, council, party, name, status, limit=limit or None
+            )
+        verboseprint(
+            "{} rows in {:.1f} ms".format(
+                len(data), (time.perf_counter() - start) * 1000
+            )
+        )
+        with pd.option_context("display.max_rows", None, "display.max_columns", None):
+            click.echo(data.to_string(index=False))
+        return data
+
+
+@cli.command(help="Refresh data, re-scraping only councils whose pages have changed")
+@click.option("--verbose", is_flag=True, help="Will print process messages")
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Will show progress and write a report with metrics of the run",
+)
+@click.option(
+    "--workers",
+    default=MAX_WORKERS,
+    show_default=True,
+    help="Number of pages fetched concurrently",
+)
+@click.option(
+    "--parser",
+    type=click.Choice(PARSERS),
+    default=HTML_PARSER,
+    show_default=True,
+    help="Parser of pages",
+)
+@click.option(
+    "--parse-processes",
+    default=PARSE_PROCESSES,
+    show_default=True,
+    help="Number of processes parsing pages of councils (0 - parse in fetching threads)",
+)
+@click.option(
+    "--extract-info/--no-extract-info",
+    "extract",
+    default=EXTRACT_INFO,
+    show_default=True,
+    help="Will extract date of birth, age, education, party membership and residence from info about candidates",
+)
+@click.option(
+    "--drop-info/--keep-info",
+    default=DROP_INFO,
+    show_default=True,
+    help="Will drop info about candidates after extraction",
+)
+def refresh(verbose, profile, workers, parser, parse_processes, extract, drop_info):
+    """Refresh scraped, merged and aggregated data incrementally.
+    Only councils whose pages have changed since the previous refresh are re-parsed,
+    and only their rows are replaced in all data files.
+
+    Args:
+        verbose (bool): will print process messages
+        profile (bool): will show progress and write a report with metrics of the run
+        workers (int): number of pages fetched concurrently
+        parser (str): parser of pages
+        parse_processes (int): number of processes parsing pages of councils (0 - parse in fetching threads)
+        extract (bool): will extract date of birth, age, education, party membership and residence
+        from info about candidates
+        drop_info (bool): will drop info about candidates after extraction
+    """
+    with profiling(profile, "refresh"), parsing_pool(parse_processes):
+        # define an ad-hoc print function for verbose option
+        verboseprint = print if verbose else lambda *a, **k: None
+        set_up_http_client(workers)
+        # every page must be revalidated on the server to detect changes
+        set_page_cache(PageCache(CACHE_DIR, ttl=0, max_size=CACHE_MAX_SIZE))
+        data_paths = [
+            CANDIDATES_RAW_FILE_PATH["all"],
+            CANDIDATES_RAW_FILE_PATH["elected"],
+            MERGED_FILE_PATH,
+            AGGREGATED_FILE_PATH,
+        ]
+        # hashes of pages are valid only if all data files exist
+        page_hashes = {}
+        if PAGE_HASHES_PATH.exists() and all(path.exists() for path in data_paths):
+            with open(PAGE_HASHES_PATH, encoding="utf-8") as f:
+                page_hashes = json.load(f)
+        else:
+            verboseprint("No previous data, all councils will be scraped")
+        candidates_data = {}
+        changed_councils = set()
+        for category in ("all", "elected"):
+            verboseprint("Checking pages of {} candidates".format(category))
+            changed_data, changed_keys = get_changed_candidates_info(
+                category=category,
+                regions=REGIONS,
+                types_of_councils=TYPES_OF_COUNCILS,
+                max_workers=workers,
+                parser=parser,
+                page_hashes=page_hashes.setdefault(category, {}),
+            )
+            verboseprint("{} councils have changed".format(len(changed_keys)))
+            if extract:
+                changed_data = extract_info(changed_data, drop_info=drop_info)
+            path = CANDIDATES_RAW_FILE_PATH[category]
+            stored_data = read_stored_table(path)
+            # replace rows of changed councils
+            candidates_data[category] = patch_groups(
+                stored_data,
+                changed_data,
+                [key[1:] for key in changed_keys],
+                keys=["Регіон", "Тип ради", "Рада"],
+            )
+            write_table(candidates_data[category], path)
+            changed_councils.update(
+                (region, council) for _, region, _, council in changed_keys
+            )
+        if changed_councils:
+            verboseprint("Updating merged and aggregated data...")
+            # merge and aggregate only changed councils
+            changed_candidates_data = {
+                category: data[
+                    pd.MultiIndex.from_frame(data[["Регіон", "Рада"]]).isin(
+                        list(changed_councils)
+                    )
+                ]
+                for category, data in candidates_data.items()
+            }
+            merged_patch = merge_candidates_info(
+                changed_candidates_data["all"], changed_candidates_data["elected"]
+            )
+            aggregated_patch = aggregate_by_party_region_council(merged_patch)
+            # replace rows of changed councils in merged and aggregated data
+            for path, patch in (
+                (MERGED_FILE_PATH, merged_patch),
+                (AGGREGATED_FILE_PATH, aggregated_patch),
+            ):
+                stored_data = read_stored_table(path)
+                patched_data = patch_groups(stored_data, patch, list(changed_councils))
+                if path == AGGREGATED_FILE_PATH:
+                    # keep the order of aggregation
+                    patched_data = patched_data.sort_values(
+                        ["Партія", "Регіон", "Рада"], kind="stable", ignore_index=True
+                    )
+                write_table(patched_data, path)
+        # hashes are written last, so an interrupted refresh is repeated
+        with open(PAGE_HASHES_PATH, "w", encoding="utf-8") as f:
+            json.dump(page_hashes, f, ensure_ascii=False)
+        verboseprint("Data successfully refreshed.")
+
+
+def run_fused(
+    verbose, workers, parser, extract, drop_info, no_cache, offline, keep_raw
+):
+    """Scrape, merge and aggregate candidates info data in one pass without intermediate files.
+    Merged rows are written in batches of councils in the order of their completion,
+    aggregated data is written at the end in the usual order.
+
+    Args:
+        verbose (bool): will print process messages
+        workers (int): number of pages fetched concurrently
+        parser (str): parser of pages
+        extract (bool): will extract date of birth, age, education, party membership and residence
+        from info about candidates
+        drop_info (bool): will drop info about candidates after extraction
+        no_cache (bool): will not use the page cache
+        offline (bool): will serve pages only from the page cache
+        keep_raw (bool): will also write scraped data of both categories
     """
     # define an ad-hoc print function for verbose option
     verboseprint = print if verbose else lambda *a, **k: None
-    # if DataFrame isn't provided, read data from files
-    if merged_candidates_data is None:
-        verboseprint("Reading data from files...")
-        merged_candidates_data = pd.read_csv(MERGED_FILE_CSV_PATH, low_memory=False)
-    # aggregate data
-    verboseprint("Data aggregating")
-    aggregated_data = aggregate_by_party_region_council(merged_candidates_data)
-    verboseprint("Writing aggregated data...")
-    # write DataFrame to CSV file
-    aggregated_data.to_csv(AGGREGATED_FILE_CSV_PATH, index=False)
+    set_up_http_client(workers)
+    set_up_page_cache(no_cache, offline)
+    writers = {"merged": TableWriter(MERGED_FILE_PATH)}
+    if keep_raw:
+        for category in ("all", "elected"):
+            writers[category] = TableWriter(CANDIDATES_RAW_FILE_PATH[category])
+    aggregated_batches = []
+    verboseprint("Scraping, merging and aggregating data...")
+    try:
+        for batch in iter_fused_candidates_info(
+            regions=REGIONS,
+            types_of_councils=TYPES_OF_COUNCILS,
+            max_workers=workers,
+            parser=parser,
+            extract=extract,
+            drop_info=drop_info,
+        ):
+            for name, writer in writers.items():
+                writer.write(batch[name])
+            aggregated_batches.append(batch["aggregated"])
+    finally:
+        for writer in writers.values():
+            writer.close()
+    verboseprint("Data successfully scraped and merged! Writing aggregated data...")
+    # every council is aggregated in a single batch, so only the order is restored
+    aggregated_data = pd.concat(aggregated_batches, ignore_index=True).sort_values(
+        ["Партія", "Регіон", "Рада"], kind="stable", ignore_index=True
+    )
+    write_table(aggregated_data, AGGREGATED_FILE_PATH)
     verboseprint("Data successfully written.")
-    return aggregated_data
 
 
 @cli.command(help="Run full pipeline")
 @click.option("--verbose", is_flag=True, help="Will print process messages")
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Will show progress and write a report with metrics of the run",
+)
+@click.option(
+    "--workers",
+    default=MAX_WORKERS,
+    show_default=True,
+    help="Number of pages fetched concurrently",
+)
+@click.option(
+    "--parser",
+    type=click.Choice(PARSERS),
+    default=HTML_PARSER,
+    show_default=True,
+    help="Parser of pages",
+)
+@click.option(
+    "--parse-processes",
+    default=PARSE_PROCESSES,
+    show_default=True,
+    help="Number of processes parsing pages of councils (0 - parse in fetching threads)",
+)
+@click.option(
+    "--extract-info/--no-extract-info",
+    "extract",
+    default=EXTRACT_INFO,
+    show_default=True,
+    help="Will extract date of birth, age, education, party membership and residence from info about candidates",
+)
+@click.option(
+    "--drop-info/--keep-info",
+    default=DROP_INFO,
+    show_default=True,
+    help="Will drop info about candidates after extraction",
+)
+@click.option("--no-cache", is_flag=True, help="Will not use the page cache")
+@click.option(
+    "--offline", is_flag=True, help="Will serve pages only from the page cache"
+)
+@click.option("--resume", is_flag=True, help="Will resume an interrupted scrape")
+@click.option(
+    "--fused",
+    is_flag=True,
+    help="Will scrape both categories at once, merging and aggregating every council as soon as it's scraped",
+)
+@click.option(
+    "--keep-raw",
+    is_flag=True,
+    help="Will also write scraped data of both categories in the fused mode",
+)
+@elections_option
 @click.pass_context
-def run_all(ctx, verbose):
+def run_all(
+    ctx,
+    verbose,
+    profile,
+    workers,
+    parser,
+    parse_processes,
+    extract,
+    drop_info,
+    no_cache,
+    offline,
+    resume,
+    fused,
+    keep_raw,
+    elections,
+):
     """Scrape, merge and aggregate candidates info data
 
     Args:
         ctx: helper argument for CLI
         verbose (bool): will print process messages
+        profile (bool): will show progress and write a report with metrics of the run
+        workers (int): number of pages fetched concurrently
+        parser (str): parser of pages
+        parse_processes (int): number of processes parsing pages of councils (0 - parse in fetching threads)
+        extract (bool): will extract date of birth, age, education, party membership and residence
+        from info about candidates
+        drop_info (bool): will drop info about candidates after extraction
+        no_cache (bool): will not use the page cache
+        offline (bool): will serve pages only from the page cache
+        resume (bool): will resume an interrupted scrape
+        fused (bool): will scrape both categories at once, merging and aggregating every council
+        as soon as it's scraped
+        keep_raw (bool): will also write scraped data of both categories in the fused mode
+        elections (tuple): names of elections crawled in a single job, data of every election
+        are merged and aggregated separately. If empty, DEFAULT_ELECTION is processed in DATA_DIR.
     """
-    candidates_data = ctx.forward(scrape)
-    merged_candidates_data = ctx.invoke(
-        merge, verbose=verbose, candidates_data=candidates_data
-    )
-    ctx.invoke(
-        aggregate, verbose=verbose, merged_candidates_data=merged_candidates_data
-    )
+    if fused and resume:
+        raise click.UsageError("--resume is not supported in the fused mode")
+    if fused and elections:
+        raise click.UsageError("--elections is not supported in the fused mode")
+    with profiling(profile, "run_all"):
+        if fused:
+            with parsing_pool(parse_processes):
+                run_fused(
+                    verbose,
+                    workers,
+                    parser,
+                    extract,
+                    drop_info,
+                    no_cache,
+                    offline,
+                    keep_raw,
+                )
+            return
+        candidates_data = ctx.invoke(
+            scrape,
+            verbose=verbose,
+            workers=workers,
+            parser=parser,
+            parse_processes=parse_processes,
+            extract=extract,
+            drop_info=drop_info,
+            no_cache=no_cache,
+            offline=offline,
+            resume=resume,
+            elections=elections,
+        )
+        merged_candidates_data = ctx.invoke(
+            merge,
+            verbose=verbose,
+            elections=elections,
+            candidates_data=candidates_data,
+        )
+        ctx.invoke(
+            aggregate,
+            verbose=verbose,
+            elections=elections,
+            merged_candidates_data=merged_candidates_data,
+        )
 
 
 if __name__ == "__main__":